@@ -6,10 +6,12 @@ organized and separated from business logic for better maintainability.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+import orjson
 from typing import Dict, Any
 from app.core.database import get_db
-from app.services.stellar_oracle import stellar_oracle_client
+from app.services.stellar_oracle import StellarOracleClient, get_stellar_oracle_client
 # Demo utils removed - now handled in frontend
 from .models import PortfolioCreate, AssetCreate, AssetUpdate, SyncRequest
 from .services import PortfolioService
@@ -18,10 +20,14 @@ router = APIRouter()
 
 
 @router.post("/users", response_model=Dict[str, str])
-async def create_user(portfolio_data: PortfolioCreate, db: Session = Depends(get_db)):
+async def create_user(
+    portfolio_data: PortfolioCreate,
+    db: Session = Depends(get_db),
+    oracle: StellarOracleClient = Depends(get_stellar_oracle_client)
+):
     """Create a new user/portfolio with automatic asset discovery"""
     try:
-        service = PortfolioService(db)
+        service = PortfolioService(db, oracle)
         result = await service.create_user(portfolio_data)
         return result
     except Exception as e:
@@ -29,10 +35,10 @@ async def create_user(portfolio_data: PortfolioCreate, db: Session = Depends(get
 
 
 @router.get("/supported-assets")
-async def get_supported_assets():
+async def get_supported_assets(oracle: StellarOracleClient = Depends(get_stellar_oracle_client)):
     """Get list of supported assets from Stellar network"""
     try:
-        assets = await stellar_oracle_client.get_supported_assets()
+        assets = await oracle.get_supported_assets()
         return {
             "supported_assets": assets,
             "total_count": len(assets)
@@ -42,10 +48,14 @@ async def get_supported_assets():
 
 
 @router.get("/{wallet_address}")
-async def get_portfolio(wallet_address: str, db: Session = Depends(get_db)):
+async def get_portfolio(
+    wallet_address: str,
+    db: Session = Depends(get_db),
+    oracle: StellarOracleClient = Depends(get_stellar_oracle_client)
+):
     """Get portfolio data for a user"""
     try:
-        service = PortfolioService(db)
+        service = PortfolioService(db, oracle)
         result = await service.get_portfolio(wallet_address)
         return result
         
@@ -64,11 +74,12 @@ async def get_portfolio(wallet_address: str, db: Session = Depends(get_db)):
 async def add_asset(
     wallet_address: str,
     asset_data: AssetCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    oracle: StellarOracleClient = Depends(get_stellar_oracle_client)
 ):
     """Add an asset to user's portfolio"""
     try:
-        service = PortfolioService(db)
+        service = PortfolioService(db, oracle)
         result = await service.add_asset(wallet_address, asset_data)
         return result
     except ValueError as e:
@@ -89,7 +100,8 @@ async def get_asset_price(
     wallet_address: str,
     asset_code: str,
     asset_issuer: str = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    oracle: StellarOracleClient = Depends(get_stellar_oracle_client)
 ):
     """Get current price for a specific asset"""
     try:
@@ -99,7 +111,7 @@ async def get_asset_price(
             raise HTTPException(status_code=400, detail="Invalid wallet address format")
         
         # Get price from oracle
-        price = await stellar_oracle_client.get_asset_price(asset_code, asset_issuer)
+        price = await oracle.get_asset_price(asset_code, asset_issuer)
         
         if price is None:
             raise HTTPException(status_code=404, detail="Asset not found or price unavailable")
@@ -123,11 +135,12 @@ async def update_asset(
     wallet_address: str,
     asset_id: int,
     update_data: AssetUpdate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    oracle: StellarOracleClient = Depends(get_stellar_oracle_client)
 ):
     """Update an asset in user's portfolio"""
     try:
-        service = PortfolioService(db)
+        service = PortfolioService(db, oracle)
         result = await service.update_asset(wallet_address, asset_id, update_data)
         return result
     except ValueError as e:
@@ -147,11 +160,12 @@ async def update_asset(
 async def delete_asset(
     wallet_address: str,
     asset_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    oracle: StellarOracleClient = Depends(get_stellar_oracle_client)
 ):
     """Delete an asset from user's portfolio"""
     try:
-        service = PortfolioService(db)
+        service = PortfolioService(db, oracle)
         result = await service.delete_asset(wallet_address, asset_id)
         return result
     except ValueError as e:
@@ -171,11 +185,12 @@ async def delete_asset(
 async def sync_portfolio(
     wallet_address: str,
     sync_request: SyncRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    oracle: StellarOracleClient = Depends(get_stellar_oracle_client)
 ):
     """Sync portfolio with current wallet state"""
     try:
-        service = PortfolioService(db)
+        service = PortfolioService(db, oracle)
         result = await service.sync_portfolio(wallet_address, sync_request)
         return result
     except ValueError as e:
@@ -193,11 +208,12 @@ async def sync_portfolio(
 async def get_asset_details(
     wallet_address: str,
     asset_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    oracle: StellarOracleClient = Depends(get_stellar_oracle_client)
 ):
     """Get detailed information about a specific asset"""
     try:
-        service = PortfolioService(db)
+        service = PortfolioService(db, oracle)
         result = await service.get_asset_details(wallet_address, asset_id)
         return result
     except ValueError as e:
@@ -219,7 +235,8 @@ async def get_asset_price_history(
     asset_code: str,
     asset_issuer: str = None,
     days: int = 30,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    oracle: StellarOracleClient = Depends(get_stellar_oracle_client)
 ):
     """Get price history for a specific asset"""
     try:
@@ -229,7 +246,7 @@ async def get_asset_price_history(
             raise HTTPException(status_code=400, detail="Invalid wallet address format")
         
         # Get price history from oracle
-        history = await stellar_oracle_client.get_price_history(asset_code, asset_issuer, days)
+        history = await oracle.get_price_history(asset_code, asset_issuer, days)
         
         if not history:
             raise HTTPException(status_code=404, detail="Price history not available for this asset")
@@ -245,3 +262,35 @@ async def get_asset_price_history(
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Error getting price history")
+
+
+@router.get("/{wallet_address}/assets/{asset_code}/history/stream")
+async def stream_asset_price_history(
+    wallet_address: str,
+    asset_code: str,
+    asset_issuer: str = None,
+    period: str = "24h",
+    interval: str = "1h",
+    oracle: StellarOracleClient = Depends(get_stellar_oracle_client)
+):
+    """Stream price history for a specific asset as NDJSON, one point per line"""
+    from .validators import validate_stellar_address
+    if not validate_stellar_address(wallet_address):
+        raise HTTPException(status_code=400, detail="Invalid wallet address format")
+    
+    points = oracle.iter_price_history(asset_code, asset_issuer, period, interval)
+    
+    # Pull the first point before responding so an empty history is still a 404
+    try:
+        first_point = await points.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(status_code=404, detail="Price history not available for this asset")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Error getting price history")
+    
+    async def ndjson_lines():
+        yield orjson.dumps(first_point) + b"\n"
+        async for point in points:
+            yield orjson.dumps(point) + b"\n"
+    
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
@@ -10,7 +10,8 @@ from typing import Optional
 from datetime import datetime
 from stellar_sdk import Keypair
 from stellar_sdk.exceptions import Ed25519PublicKeyInvalidError
-import re
+
+from .validators import STELLAR_ADDRESS_RE
 
 
 class PortfolioCreate(BaseModel):
@@ -32,7 +33,7 @@ class PortfolioCreate(BaseModel):
             raise ValueError('Stellar wallet address must be 56 characters long')
         
         # Check if it contains only valid base32 characters
-        if not re.match(r'^[A-Z2-7]+$', v):
+        if not STELLAR_ADDRESS_RE.match(v):
             raise ValueError('Invalid Stellar wallet address format')
         
         # Try to create a Keypair to validate the address
@@ -8,7 +8,7 @@ separated from the API endpoints for better organization and testability.
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from app.models.database import User, Portfolio, PriceHistory
-from app.services.stellar_oracle import stellar_oracle_client
+from app.services.stellar_oracle import StellarOracleClient
 from .models import PortfolioCreate, AssetCreate, AssetUpdate, SyncRequest
 from .validators import validate_stellar_address, validate_asset_exists
 from .utils import discover_wallet_assets, calculate_simple_risk_score, format_asset_data
@@ -19,8 +19,9 @@ from app.api.v1.alerts import create_sample_alerts
 class PortfolioService:
     """Service class for portfolio business logic"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, oracle: StellarOracleClient):
         self.db = db
+        self.oracle = oracle
     
     async def create_user(self, portfolio_data: PortfolioCreate) -> Dict[str, Any]:
         """Create a new user/portfolio with automatic asset discovery"""
@@ -46,7 +47,7 @@ class PortfolioService:
             self.db.refresh(new_user)
             
             # Discover assets from wallet
-            discovered_assets = await discover_wallet_assets(portfolio_data.wallet_address)
+            discovered_assets = await discover_wallet_assets(portfolio_data.wallet_address, self.oracle)
             assets_added = 0
             
             # If no assets discovered, add some mock assets for demonstration
@@ -75,7 +76,7 @@ class PortfolioService:
             for asset_data in discovered_assets:
                 if 'price_usd' not in asset_data or asset_data['price_usd'] is None:
                     try:
-                        price_usd = await stellar_oracle_client.get_asset_price(
+                        price_usd = await self.oracle.get_asset_price(
                             asset_data['asset_code'], 
                             asset_data['asset_issuer']
                         )
@@ -154,7 +155,7 @@ class PortfolioService:
         for asset in assets:
             # Get current price
             try:
-                price_usd = await stellar_oracle_client.get_asset_price(
+                price_usd = await self.oracle.get_asset_price(
                     asset.asset_code, asset.asset_issuer
                 )
                 # If no price available, set to 0
@@ -195,7 +196,7 @@ class PortfolioService:
             raise ValueError("Invalid wallet address format")
         
         # Validate asset exists in the Stellar network
-        if not await validate_asset_exists(asset_data.asset_code, asset_data.asset_issuer):
+        if not await validate_asset_exists(asset_data.asset_code, asset_data.asset_issuer, self.oracle):
             raise ValueError("Invalid asset")
         
         user = self.db.query(User).filter(User.wallet_address == wallet_address).first()
@@ -335,7 +336,7 @@ class PortfolioService:
             raise ValueError("User not found")
         
         # Discover current assets in wallet
-        discovered_assets = await discover_wallet_assets(wallet_address)
+        discovered_assets = await discover_wallet_assets(wallet_address, self.oracle)
         
         # Get current portfolio assets
         current_assets = self.db.query(Portfolio).filter(
@@ -406,7 +407,7 @@ class PortfolioService:
         
         # Get current price
         try:
-            price_usd = await stellar_oracle_client.get_asset_price(
+            price_usd = await self.oracle.get_asset_price(
                 asset.asset_code, asset.asset_issuer
             )
         except Exception:
@@ -414,7 +415,7 @@ class PortfolioService:
         
         # Get price history from oracle (last 30 days)
         try:
-            history_data = await stellar_oracle_client.get_price_history(
+            history_data = await self.oracle.get_price_history(
                 asset.asset_code, asset.asset_issuer, 30
             )
         except Exception as e:
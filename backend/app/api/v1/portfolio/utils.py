@@ -4,36 +4,38 @@ Utility functions for portfolio domain.
 This module contains utility functions used throughout the portfolio domain.
 """
 
-from typing import List, Dict, Any
-from stellar_sdk import Server
-from app.core.config import settings
+from typing import List, Dict, Any, Optional
+from app.services.stellar_oracle import StellarOracleClient, get_stellar_oracle_client
+
+
+# Mock prices for demo purposes, built once at import
+MOCK_PRICES = {
+    'XLM': 0.12,
+    'USDC': 1.0,
+    'BTC': 45000.0,
+    'ETH': 3000.0,
+    'ADA': 0.45,
+    'DOT': 6.5,
+    'LINK': 14.2,
+    'UNI': 8.7,
+    'AAVE': 95.0,
+    'COMP': 45.0
+}
 
 
 def get_mock_price(asset_code: str) -> float:
     """Get mock price for demo purposes when real prices are not available"""
-    mock_prices = {
-        'XLM': 0.12,
-        'USDC': 1.0,
-        'BTC': 45000.0,
-        'ETH': 3000.0,
-        'ADA': 0.45,
-        'DOT': 6.5,
-        'LINK': 14.2,
-        'UNI': 8.7,
-        'AAVE': 95.0,
-        'COMP': 45.0
-    }
-    return mock_prices.get(asset_code.upper(), 1.0)  # Default to $1 if not found
+    return MOCK_PRICES.get(asset_code.upper(), 1.0)  # Default to $1 if not found
 
 
-async def discover_wallet_assets(wallet_address: str) -> List[Dict[str, Any]]:
+async def discover_wallet_assets(wallet_address: str, oracle: Optional[StellarOracleClient] = None) -> List[Dict[str, Any]]:
     """Discover assets in a Stellar wallet using Horizon API"""
     try:
-        # Use the same Horizon server as configured
-        server = Server(settings.HORIZON_URL)
+        # Use the oracle client's pooled Horizon server
+        server = (oracle or get_stellar_oracle_client()).server
         
         # Get account data
-        account = server.accounts().account_id(wallet_address).call()
+        account = await server.accounts().account_id(wallet_address).call()
         
         assets = []
         for balance in account.get('balances', []):
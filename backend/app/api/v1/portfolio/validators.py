@@ -7,9 +7,12 @@ This module contains validation functions used throughout the portfolio domain.
 import re
 import asyncio
 from typing import Optional
-from stellar_sdk import Keypair, Server
+from stellar_sdk import Keypair
 from stellar_sdk.exceptions import Ed25519PublicKeyInvalidError, NotFoundError
-from app.core.config import settings
+from app.services.stellar_oracle import StellarOracleClient, get_stellar_oracle_client
+
+# Base32 alphabet used by Stellar public keys, compiled once for every check
+STELLAR_ADDRESS_RE = re.compile(r'^[A-Z2-7]+$')
 
 
 def validate_stellar_address(address: str) -> bool:
@@ -24,7 +27,7 @@ def validate_stellar_address(address: str) -> bool:
         return True
     
     # Check length and format
-    if len(address) != 56 or not re.match(r'^[A-Z2-7]+$', address):
+    if len(address) != 56 or not STELLAR_ADDRESS_RE.match(address):
         return False
     
     # Try to create a Keypair to validate
@@ -35,13 +38,18 @@ def validate_stellar_address(address: str) -> bool:
         return False
 
 
-async def validate_asset_exists(asset_code: str, asset_issuer: Optional[str] = None) -> bool:
+async def validate_asset_exists(
+    asset_code: str,
+    asset_issuer: Optional[str] = None,
+    oracle: Optional[StellarOracleClient] = None
+) -> bool:
     """
     Validate if an asset exists in the Stellar network.
     
     Args:
         asset_code: The asset code (e.g., 'XLM', 'USDC')
         asset_issuer: The asset issuer public key (required for custom assets)
+        oracle: Oracle client whose Horizon server to query (the shared one if omitted)
     
     Returns:
         bool: True if asset exists and is valid, False otherwise
@@ -67,10 +75,12 @@ async def validate_asset_exists(asset_code: str, asset_issuer: Optional[str] = N
     
     # Query Horizon API to check if the asset exists
     try:
-        server = Server(settings.HORIZON_URL)
+        # Reuse the oracle client's pooled Horizon connections instead of
+        # opening a new session for every validation
+        server = (oracle or get_stellar_oracle_client()).server
         
         # Get asset details from Horizon API
-        asset = server.assets().for_code(asset_code).for_issuer(asset_issuer).call()
+        asset = await server.assets().for_code(asset_code).for_issuer(asset_issuer).call()
         
         # If we get here, the asset exists
         return True
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 from app.core.database import get_db
 from app.models.database import User, Portfolio, RebalanceHistory
-from app.services.stellar_oracle import stellar_oracle_client
+from app.services.stellar_oracle import StellarOracleClient, get_stellar_oracle_client
 from pydantic import BaseModel
 from datetime import datetime
 import json
@@ -35,7 +35,8 @@ class RebalanceExecute(BaseModel):
 @router.post("/suggest", response_model=RebalanceResponse)
 async def suggest_rebalancing(
     request: RebalanceRequest, 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    oracle: StellarOracleClient = Depends(get_stellar_oracle_client)
 ):
     """Suggest rebalancing for a portfolio"""
     try:
@@ -55,7 +56,7 @@ async def suggest_rebalancing(
         total_value = 0.0
         
         for portfolio in portfolios:
-            price = await stellar_oracle_client.get_asset_price(
+            price = await oracle.get_asset_price(
                 portfolio.asset_code, 
                 portfolio.asset_issuer
             )
@@ -7,7 +7,6 @@ from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 from app.core.database import get_db
 from app.models.database import User, Portfolio, RiskMetrics
-from app.services.stellar_oracle import stellar_oracle_client
 from app.services.ai_portfolio_analyzer import ai_analyzer
 # Demo utils removed - now handled in frontend
 from pydantic import BaseModel, Field
@@ -149,7 +148,7 @@ async def comprehensive_ai_analysis(
     """Perform comprehensive AI analysis including risk, predictions, and recommendations"""
     try:
         # Debug logging
-        logger.info(f"AI Analysis endpoint called with wallet: {request_data.wallet_address}")
+        logger.info("AI Analysis endpoint called with wallet: %s", request_data.wallet_address)
         
         # Get user and portfolio
         user = db.query(User).filter(User.wallet_address == request_data.wallet_address).first()
@@ -41,6 +41,23 @@ class Settings(BaseSettings):
     REFLECTOR_EXTERNAL_CEX_TESTNET: str = "CCYOZX2H4Z3HUBXHAP5GLOAYQ73TGLMZB7O6FY7JFB7FUMW3ET5KMJRN6"
     REFLECTOR_FIAT_TESTNET: str = "CCSSMW2RJTT4T5CB77P4GM2O7IQP5URZ5ICUEN5Y53D2QDDNAGU5NV4WFI"
     
+    # Oracle client tuning
+    ORACLE_PRICE_CACHE_TTL: int = 15  # seconds prices stay in the in-process cache
+    ORACLE_PRICE_CACHE_SIZE: int = 1024  # max entries in the in-process price cache
+    ORACLE_PRICE_FRESH_TTL: int = 60  # seconds a Redis price is served without a refresh
+    ORACLE_PRICE_STALE_TTL: int = 600  # seconds a Redis price is kept, refreshed in the background
+    ORACLE_MAX_CONCURRENCY: int = 8  # concurrent outbound price fetches
+    ORACLE_MAX_BATCH_SIZE: int = 20  # JSON-RPC requests per Soroban batch call
+    ORACLE_HEALTH_CACHE_TTL: float = 5.0  # seconds a healthy health check result is reused
+    ORACLE_HTTP_POOL_SIZE: int = 64  # max open connections per upstream client
+    ORACLE_HTTP_CONNECT_TIMEOUT: float = 3.0  # seconds to establish a connection
+    ORACLE_HTTP_READ_TIMEOUT: float = 5.0  # seconds to wait for a response
+    ORACLE_HTTP_POOL_TIMEOUT: float = 2.0  # seconds to wait for a free pooled connection
+    # Stablecoins priced at $1 without any lookup, as CODE:ISSUER so only the
+    # known issuer's asset is pegged (Circle USDC)
+    ORACLE_STABLE_PEGS_MAINNET: List[str] = ["USDC:GA5ZSEJYB37JRC5AVCIA5MOP4RHTM335X2KGX3IHOJAPP5RE34K4KZVN"]
+    ORACLE_STABLE_PEGS_TESTNET: List[str] = ["USDC:GBBD47IF6LWK7P7MDEVSCWR7DPUWV3NY3DTQEVFL4NAT4AQH3ZLLFLA5"]
+    
     # Security
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
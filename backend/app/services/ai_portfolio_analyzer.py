@@ -19,14 +19,14 @@ import warnings
 warnings.filterwarnings('ignore')
 
 from app.services.reflector import reflector_client
-from app.services.stellar_oracle import stellar_oracle_client
+from app.services.stellar_oracle import get_stellar_oracle_client
 from app.services.cache import cache_service
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PricePoint:
-    """Single price point in time"""
+    """Single price point in time (slotted, since histories hold hundreds of these)"""
     timestamp: datetime
     price: float
     volume: Optional[float] = None
@@ -102,7 +102,7 @@ class AIPortfolioAnalyzer:
             Tuple of (risk_metrics, price_predictions, recommendations)
         """
         try:
-            logger.info(f"Starting AI analysis for {len(assets)} assets")
+            logger.info("Starting AI analysis for %s assets", len(assets))
             
             # Step 1: Enhance asset data with real market data
             enhanced_assets = await self._enhance_asset_data(assets)
@@ -125,7 +125,7 @@ class AIPortfolioAnalyzer:
             return risk_metrics, price_predictions, recommendations
             
         except Exception as e:
-            logger.error(f"Error in AI portfolio analysis: {str(e)}")
+            logger.error("Error in AI portfolio analysis: %s", e)
             raise
     
     async def _enhance_asset_data(self, assets: List[Dict]) -> List[PortfolioAsset]:
@@ -148,7 +148,7 @@ class AIPortfolioAnalyzer:
                 if data['price']:
                     total_value += asset['balance'] * data['price']
             except Exception as e:
-                logger.warning(f"Failed to get price data for {asset['asset_code']}: {str(e)}")
+                logger.warning("Failed to get price data for %s: %s", asset['asset_code'], e)
                 # Use fallback data
                 price_data[asset['asset_code']] = {
                     'price': 0.1,  # Fallback price
@@ -196,18 +196,18 @@ class AIPortfolioAnalyzer:
             try:
                 price = await reflector_client.get_asset_price(asset_code, asset_issuer)
                 if price:
-                    logger.info(f"Got price from Reflector for {asset_code}: ${price}")
+                    logger.info("Got price from Reflector for %s: $%s", asset_code, price)
             except Exception as e:
-                logger.warning(f"Reflector price failed for {asset_code}: {str(e)}")
+                logger.warning("Reflector price failed for %s: %s", asset_code, e)
             
             # Fallback to Stellar Oracle
             if not price:
                 try:
-                    price = await stellar_oracle_client.get_asset_price(asset_code, asset_issuer)
+                    price = await get_stellar_oracle_client().get_asset_price(asset_code, asset_issuer)
                     if price:
-                        logger.info(f"Got price from Stellar Oracle for {asset_code}: ${price}")
+                        logger.info("Got price from Stellar Oracle for %s: $%s", asset_code, price)
                 except Exception as e:
-                    logger.warning(f"Stellar Oracle price failed for {asset_code}: {str(e)}")
+                    logger.warning("Stellar Oracle price failed for %s: %s", asset_code, e)
             
             # Get historical data for volatility calculation
             historical_data = await self._get_price_history(asset_code, asset_issuer)
@@ -231,7 +231,7 @@ class AIPortfolioAnalyzer:
             return data
             
         except Exception as e:
-            logger.error(f"Error getting enhanced price data for {asset_code}: {str(e)}")
+            logger.error("Error getting enhanced price data for %s: %s", asset_code, e)
             # Return fallback data
             return {
                 'price': 0.1,
@@ -247,7 +247,10 @@ class AIPortfolioAnalyzer:
         # Check cache
         cached_history = cache_service.get(cache_key)
         if cached_history:
-            return [PricePoint(**point) for point in cached_history]
+            return [
+                PricePoint(datetime.fromisoformat(point['timestamp']), point['price'], point.get('volume'))
+                for point in cached_history
+            ]
         
         try:
             # Try to get from Reflector first
@@ -257,7 +260,7 @@ class AIPortfolioAnalyzer:
             
             if not history_data:
                 # Generate synthetic historical data for demo
-                logger.info(f"No historical data available for {asset_code}, generating synthetic data")
+                logger.info("No historical data available for %s, generating synthetic data", asset_code)
                 history_data = self._generate_synthetic_history(asset_code)
             
             # Convert to PricePoint objects
@@ -276,7 +279,7 @@ class AIPortfolioAnalyzer:
             return price_points
             
         except Exception as e:
-            logger.error(f"Error getting price history for {asset_code}: {str(e)}")
+            logger.error("Error getting price history for %s: %s", asset_code, e)
             # Return synthetic data as fallback
             return self._generate_synthetic_history(asset_code)
     
@@ -331,7 +334,7 @@ class AIPortfolioAnalyzer:
             return min(volatility, 2.0)  # Cap at 200%
             
         except Exception as e:
-            logger.warning(f"Error calculating volatility: {str(e)}")
+            logger.warning("Error calculating volatility: %s", e)
             return 0.2
     
     def _calculate_beta(self, price_history: List[PricePoint], asset_code: str) -> float:
@@ -377,7 +380,7 @@ class AIPortfolioAnalyzer:
             return 0.7  # Default beta
             
         except Exception as e:
-            logger.warning(f"Error calculating beta for {asset_code}: {str(e)}")
+            logger.warning("Error calculating beta for %s: %s", asset_code, e)
             return 0.7
     
     def _calculate_correlation_with_xlm(self, price_history: List[PricePoint], asset_code: str) -> float:
@@ -419,7 +422,7 @@ class AIPortfolioAnalyzer:
             return 0.4  # Default correlation
             
         except Exception as e:
-            logger.warning(f"Error calculating correlation for {asset_code}: {str(e)}")
+            logger.warning("Error calculating correlation for %s: %s", asset_code, e)
             return 0.4
     
     async def _calculate_advanced_risk_metrics(self, assets: List[PortfolioAsset]) -> RiskMetrics:
@@ -523,7 +526,7 @@ class AIPortfolioAnalyzer:
             return result
             
         except Exception as e:
-            logger.warning(f"Error calculating portfolio volatility: {str(e)}")
+            logger.warning("Error calculating portfolio volatility: %s", e)
             return 0.2
     
     def _calculate_var_historical(self, assets: List[PortfolioAsset], confidence: float) -> float:
@@ -557,7 +560,7 @@ class AIPortfolioAnalyzer:
             return max(var, 0)
             
         except Exception as e:
-            logger.warning(f"Error calculating VaR: {str(e)}")
+            logger.warning("Error calculating VaR: %s", e)
             return 0.0
     
     def _calculate_conditional_var(self, assets: List[PortfolioAsset], confidence: float) -> float:
@@ -607,7 +610,7 @@ class AIPortfolioAnalyzer:
             return sharpe_ratio
             
         except Exception as e:
-            logger.warning(f"Error calculating Sharpe ratio: {str(e)}")
+            logger.warning("Error calculating Sharpe ratio: %s", e)
             return 0.0
     
     def _calculate_sortino_ratio(self, assets: List[PortfolioAsset]) -> float:
@@ -715,7 +718,7 @@ class AIPortfolioAnalyzer:
                 history = await self._get_price_history(asset.asset_code, asset.asset_issuer)
                 
                 if len(history) < 10:
-                    logger.warning(f"Insufficient data for prediction: {asset.asset_code}")
+                    logger.warning("Insufficient data for prediction: %s", asset.asset_code)
                     continue
                 
                 # Generate prediction
@@ -723,7 +726,7 @@ class AIPortfolioAnalyzer:
                 predictions.append(prediction)
                 
             except Exception as e:
-                logger.error(f"Error predicting price for {asset.asset_code}: {str(e)}")
+                logger.error("Error predicting price for %s: %s", asset.asset_code, e)
                 continue
         
         return predictions
@@ -1076,14 +1079,14 @@ class AIPortfolioAnalyzer:
                     anomaly_results[asset.asset_code] = is_anomalous
                     
                     if is_anomalous:
-                        logger.warning(f"Price anomaly detected for {asset.asset_code} at ${asset.current_price}")
+                        logger.warning("Price anomaly detected for %s at $%s", asset.asset_code, asset.current_price)
                     
                 except Exception as e:
-                    logger.warning(f"Anomaly detection failed for {asset.asset_code}: {str(e)}")
+                    logger.warning("Anomaly detection failed for %s: %s", asset.asset_code, e)
                     anomaly_results[asset.asset_code] = False
                 
             except Exception as e:
-                logger.error(f"Error in anomaly detection for {asset.asset_code}: {str(e)}")
+                logger.error("Error in anomaly detection for %s: %s", asset.asset_code, e)
                 anomaly_results[asset.asset_code] = False
         
         return anomaly_results
@@ -1140,7 +1143,7 @@ class AIPortfolioAnalyzer:
                 }
                 
             except Exception as e:
-                logger.error(f"Error detecting anomalies for {asset_code}: {str(e)}")
+                logger.error("Error detecting anomalies for %s: %s", asset_code, e)
                 results[asset_code] = {
                     "is_anomalous": False,
                     "anomaly_score": 0.0,
@@ -4,6 +4,8 @@ Redis cache service for DeFi Risk Guardian
 
 import redis
 import json
+import msgpack
+import zstandard
 import logging
 from typing import Any, Optional, Union
 from datetime import timedelta
@@ -11,10 +13,27 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Every zstd frame starts with this magic number, which no msgpack value does
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
 class CacheService:
     """Redis cache service with TTL support"""
     
+    # Packed values at least this large are stored zstd-compressed
+    COMPRESS_MIN_BYTES = 1024
+    COMPRESS_LEVEL = 3
+    
     def __init__(self):
+        # Connect on first use rather than at import, so importing this module
+        # (tests, tooling, workers that never touch the cache) opens no sockets
+        self.redis_client = None
+        self.binary_client = None
+        self.connected = False
+        self._initialized = False
+    
+    def _connect(self):
+        """Create the Redis clients and check the connection"""
+        self._initialized = True
         try:
             self.redis_client = redis.from_url(
                 settings.REDIS_URL,
@@ -22,17 +41,28 @@ class CacheService:
                 socket_connect_timeout=5,
                 socket_timeout=5
             )
+            # Binary client for msgpack values, which can't go through the
+            # decoding client above
+            self.binary_client = redis.from_url(
+                settings.REDIS_URL,
+                socket_connect_timeout=5,
+                socket_timeout=5
+            )
             # Test connection
             self.redis_client.ping()
             self.connected = True
             logger.info("Redis connection established")
         except Exception as e:
-            logger.error(f"Redis connection failed: {e}")
+            logger.error("Redis connection failed: %s", e)
             self.redis_client = None
+            self.binary_client = None
             self.connected = False
     
     def is_connected(self) -> bool:
         """Check if Redis is connected"""
+        if not self._initialized:
+            self._connect()
+            return self.connected
         if not self.connected or not self.redis_client:
             return False
         try:
@@ -53,7 +83,7 @@ class CacheService:
                 return json.loads(value)
             return None
         except Exception as e:
-            logger.error(f"Cache get error for key {key}: {e}")
+            logger.error("Cache get error for key %s: %s", key, e)
             return None
     
     def set(self, key: str, value: Any, ttl_seconds: int = 300) -> bool:
@@ -65,7 +95,38 @@ class CacheService:
             serialized_value = json.dumps(value)
             return self.redis_client.setex(key, ttl_seconds, serialized_value)
         except Exception as e:
-            logger.error(f"Cache set error for key {key}: {e}")
+            logger.error("Cache set error for key %s: %s", key, e)
+            return False
+    
+    def get_packed(self, key: str) -> Optional[Any]:
+        """Get a msgpack-encoded value from cache"""
+        if not self.is_connected():
+            return None
+        
+        try:
+            value = self.binary_client.get(key)
+            if value:
+                if value.startswith(ZSTD_MAGIC):
+                    value = zstandard.decompress(value)
+                return msgpack.unpackb(value, raw=False)
+            return None
+        except Exception as e:
+            logger.error("Cache get error for key %s: %s", key, e)
+            return None
+    
+    def set_packed(self, key: str, value: Any, ttl_seconds: int = 300) -> bool:
+        """Set a value in cache with TTL, encoded with msgpack (more compact than JSON for large lists)
+        and zstd-compressed when large"""
+        if not self.is_connected():
+            return False
+        
+        try:
+            packed_value = msgpack.packb(value, use_bin_type=True)
+            if len(packed_value) >= self.COMPRESS_MIN_BYTES:
+                packed_value = zstandard.compress(packed_value, self.COMPRESS_LEVEL)
+            return self.binary_client.setex(key, ttl_seconds, packed_value)
+        except Exception as e:
+            logger.error("Cache set error for key %s: %s", key, e)
             return False
     
     def delete(self, key: str) -> bool:
@@ -76,7 +137,7 @@ class CacheService:
         try:
             return bool(self.redis_client.delete(key))
         except Exception as e:
-            logger.error(f"Cache delete error for key {key}: {e}")
+            logger.error("Cache delete error for key %s: %s", key, e)
             return False
     
     def get_stats(self) -> dict:
@@ -47,11 +47,11 @@ class ReflectorClient:
                     data = response.json()
                     return float(data.get("price_usd", 0))
                 else:
-                    logger.warning(f"Failed to get price for {asset_id}: {response.status_code}")
+                    logger.warning("Failed to get price for %s: %s", asset_id, response.status_code)
                     return None
                     
         except Exception as e:
-            logger.error(f"Error getting price for {asset_code}: {str(e)}")
+            logger.error("Error getting price for %s: %s", asset_code, e)
             return None
     
     async def get_price_history(
@@ -94,11 +94,11 @@ class ReflectorClient:
                     data = response.json()
                     return data.get("history", [])
                 else:
-                    logger.warning(f"Failed to get history for {asset_id}: {response.status_code}")
+                    logger.warning("Failed to get history for %s: %s", asset_id, response.status_code)
                     return []
                     
         except Exception as e:
-            logger.error(f"Error getting history for {asset_code}: {str(e)}")
+            logger.error("Error getting history for %s: %s", asset_code, e)
             return []
     
     async def get_supported_assets(self) -> List[Dict]:
@@ -119,11 +119,11 @@ class ReflectorClient:
                     data = response.json()
                     return data.get("assets", [])
                 else:
-                    logger.warning(f"Failed to get supported assets: {response.status_code}")
+                    logger.warning("Failed to get supported assets: %s", response.status_code)
                     return []
                     
         except Exception as e:
-            logger.error(f"Error getting supported assets: {str(e)}")
+            logger.error("Error getting supported assets: %s", e)
             return []
     
     async def get_multiple_prices(self, assets: List[Dict]) -> Dict[str, float]:
@@ -154,7 +154,7 @@ class ReflectorClient:
                 if price is not None:
                     prices[asset_code] = price
             except Exception as e:
-                logger.error(f"Error getting price for {asset_code}: {str(e)}")
+                logger.error("Error getting price for %s: %s", asset_code, e)
         
         return prices
     
@@ -170,7 +170,7 @@ class ReflectorClient:
                 response = await client.get(f"{self.base_url}/health")
                 return response.status_code == 200
         except Exception as e:
-            logger.error(f"Reflector health check failed: {str(e)}")
+            logger.error("Reflector health check failed: %s", e)
             return False
 
 # Global instance
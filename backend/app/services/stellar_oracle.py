@@ -3,26 +3,138 @@ Stellar Oracle client using SDK for on-chain contract calls
 """
 
 import asyncio
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+import functools
+import time
+import weakref
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Dict, Optional, Tuple, Union
+from datetime import datetime, timedelta, timezone
 import logging
-from stellar_sdk import Server, Keypair, Network, Asset
-from stellar_sdk.exceptions import SdkError, NotFoundError
+import httpx
+import msgspec
+import numpy as np
+import orjson
+from stellar_sdk import ServerAsync, Network, Asset
+from stellar_sdk.client.aiohttp_client import AiohttpClient
 from app.core.config import settings
 from app.services.cache import cache_service
 
 logger = logging.getLogger(__name__)
 
+try:
+    # C parser, much faster than fromisoformat on Horizon timestamps
+    from ciso8601 import parse_datetime as parse_iso_datetime
+except ImportError:
+    def parse_iso_datetime(value: str) -> datetime:
+        """Parse an ISO 8601 timestamp, accepting a 'Z' UTC suffix"""
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+# Native XLM, as a Horizon asset and as its Stellar Asset Contract address
+_XLM_ASSET = Asset.native()
+_NATIVE_XLM_CONTRACT = "CDLZFC3SYJYDZT7K67VZ75HPJVIEUVNIXF47ZG2FB2RMQQAHHXCN3A3A"
+
+class PriceData(msgspec.Struct):
+    """Reflector PriceData, keeping only the price (i128 with 14 decimals)"""
+    price: Union[int, str, None] = None
+
+class SimulateResult(msgspec.Struct):
+    """Result of a simulated lastprice call"""
+    success: bool = False
+    result: Optional[PriceData] = None
+
+class SimulateResponse(msgspec.Struct):
+    """simulateTransaction JSON-RPC response, decoding only the fields we read"""
+    id: Union[int, str, None] = None
+    result: Optional[SimulateResult] = None
+    error: Any = None
+
+_SIMULATE_DECODER = msgspec.json.Decoder(SimulateResponse)
+_SIMULATE_BATCH_DECODER = msgspec.json.Decoder(List[SimulateResponse])
+
+@functools.lru_cache(maxsize=256)
+def _stellar_asset(asset_code: str, asset_issuer: Optional[str] = None) -> Asset:
+    """Build (and memoize) the Horizon asset for a code/issuer pair"""
+    if asset_code.upper() == "XLM":
+        return _XLM_ASSET
+    return Asset(asset_code, asset_issuer)
+
 class StellarOracleClient:
     """Client for Stellar on-chain oracle contracts (Reflector)"""
     
-    def __init__(self):
+    # Reflector contract sources in order of preference
+    # Priority 1: Stellar Pubnet (for Stellar assets like XLM, USDC)
+    # Priority 2: External CEX & DEX (fallback for all assets)
+    # Priority 3: Fiat exchange rates (for fiat currencies)
+    CONTRACT_SOURCES = (
+        ("stellar_dex", "Stellar Pubnet prices"),
+        ("external_cex", "External CEX/DEX prices"),
+        ("fiat", "Fiat exchange rates")
+    )
+    
+    # Circuit breaker: consecutive failures before a contract source is
+    # skipped, and how long it stays skipped
+    BREAKER_FAILURE_THRESHOLD = 3
+    BREAKER_COOL_OFF_SECONDS = 10.0
+    
+    # How long a learned asset -> contract source mapping is kept in Redis
+    SOURCE_HINT_TTL = 3600
+    
+    # Upper bound for each health check ping, in seconds
+    HEALTH_CHECK_TIMEOUT = 0.5
+    
+    # Upper bound for one asset's fallback lookup in a multi-asset request
+    FALLBACK_TIMEOUT = 5.0
+    
+    # Cached in place of a price when no source could price an asset, so
+    # repeated lookups for unknown assets don't hit every source again
+    PRICE_MISS = "miss"
+    PRICE_MISS_TTL = 30
+    
+    # Last-resort prices by asset code, used only after every source missed
+    FALLBACK_PRICES = {"XLM": 0.12, "USDC": 1.0}
+    
+    # In-process cache entry for the XLM/USD rate used to convert DEX prices
+    XLM_USD_KEY = "XLM/USD"
+    
+    # Reflector Oracle prices are i128 fixed-point with 14 decimals
+    _PRICE_SCALE = 1e-14
+    
+    # Fixed parts of the simulateTransaction payload for lastprice calls
+    _SIMULATION_TX_FIELDS = {
+        "sourceAccount": "GAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAWHF",  # Dummy account for simulation
+        "fee": "100",
+        "sequence": "0",
+        "timeBounds": {
+            "minTime": "0",
+            "maxTime": "0"
+        }
+    }
+    _NATIVE_ASSET_ARG = {
+        "type": "address",
+        "value": {
+            "type": "Stellar",
+            "address": _NATIVE_XLM_CONTRACT
+        }
+    }
+    
+    # Horizon trade paging for price history: page size, page cap per
+    # refresh, and how long the incremental per-hour state is kept
+    TRADES_PAGE_SIZE = 200
+    HISTORY_MAX_PAGES = 10
+    HISTORY_RETENTION_HOURS = 30 * 24
+    HISTORY_STATE_TTL = 24 * 3600
+    
+    # Redis keys are namespaced as oracle:{domain}:{id}[:{sub}]
+    SUPPORTED_ASSETS_KEY = "oracle:assets:all"
+    
+    def __init__(self, speculate_dex: bool = True):
+        """
+        Args:
+            speculate_dex: Start the DEX trades fallback alongside the contract
+                calls on a cache miss (disable when Horizon is rate limited)
+        """
         self.network = settings.STELLAR_NETWORK
         self.horizon_url = settings.HORIZON_URL
         
-        # Initialize Stellar server
-        self.server = Server(self.horizon_url)
-        
         # Set network and configure Soroban RPC URL
         if self.network == "testnet":
             Network.testnet_network()
@@ -32,6 +144,7 @@ class StellarOracleClient:
                 "external_cex": settings.REFLECTOR_EXTERNAL_CEX_TESTNET,
                 "fiat": settings.REFLECTOR_FIAT_TESTNET
             }
+            stable_pegs = settings.ORACLE_STABLE_PEGS_TESTNET
         elif self.network == "futurenet":
             Network.testnet_network()  # Futurenet uses testnet network
             self.soroban_rpc_url = settings.SOROBAN_RPC_FUTURENET
@@ -40,6 +153,7 @@ class StellarOracleClient:
                 "external_cex": settings.REFLECTOR_EXTERNAL_CEX_TESTNET,
                 "fiat": settings.REFLECTOR_FIAT_TESTNET
             }
+            stable_pegs = settings.ORACLE_STABLE_PEGS_TESTNET
         else:
             Network.public_network()
             self.soroban_rpc_url = settings.SOROBAN_RPC_MAINNET
@@ -48,6 +162,149 @@ class StellarOracleClient:
                 "external_cex": settings.REFLECTOR_EXTERNAL_CEX_MAINNET,
                 "fiat": settings.REFLECTOR_FIAT_MAINNET
             }
+            stable_pegs = settings.ORACLE_STABLE_PEGS_MAINNET
+        
+        # Contract IDs are fixed after construction, so check them once here
+        # rather than on every health check
+        self._contracts_configured = all(self.contracts.values())
+        if not self._contracts_configured:
+            logger.warning("Not all Reflector contract IDs are configured")
+        
+        # In-process price cache (asset_id -> (price, expiry)) in front of Redis
+        self.price_cache_ttl = settings.ORACLE_PRICE_CACHE_TTL
+        self.price_cache_size = settings.ORACLE_PRICE_CACHE_SIZE
+        self._price_cache: Dict[str, Tuple[float, float]] = {}
+        
+        # Redis prices are served as-is while fresh, and served but refreshed
+        # in the background once stale, until they expire
+        self.price_fresh_ttl = settings.ORACLE_PRICE_FRESH_TTL
+        self.price_stale_ttl = settings.ORACLE_PRICE_STALE_TTL
+        self._background_tasks: set = set()
+        
+        self.speculate_dex = speculate_dex
+        
+        # Last contract source that priced each asset (asset_id -> contract type),
+        # mirroring the hints persisted in Redis
+        self._source_hint: Dict[str, str] = {}
+        
+        # Per-contract circuit breaker state, so a failing source is skipped
+        # for a cool-off period instead of being retried for every asset
+        self._breaker: Dict[str, Dict[str, float]] = {
+            contract_id: {"fails": 0, "open_until": 0.0}
+            for contract_id in self.contracts.values()
+        }
+        
+        # Fetch semaphore, in-flight lookups and HTTP clients for each event
+        # loop using the client (see _loop_state), since asyncio primitives and
+        # connection pools are bound to one loop
+        self._loop_states: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        
+        # Largest JSON-RPC batch sent to Soroban RPC in one request
+        self.max_batch_size = settings.ORACLE_MAX_BATCH_SIZE
+        
+        # Stablecoins pinned to $1 (asset_id -> price), answered before any
+        # cache or network lookup. Keyed by issuer too, since anyone can issue
+        # an asset with a stablecoin's code
+        self.stable_pegs = {asset_id: 1.0 for asset_id in stable_pegs}
+        
+        # Externally managed clients that replace the per-loop ones when set
+        self._http_override: Optional[httpx.AsyncClient] = None
+        self._server_override: Optional[ServerAsync] = None
+        
+        # Last healthy health check result as (monotonic time, result), so
+        # bursts of probes don't each ping Horizon and the Soroban RPC
+        self.health_cache_ttl = settings.ORACLE_HEALTH_CACHE_TTL
+        self._health_cache: Optional[Tuple[float, Dict]] = None
+    
+    @property
+    def server(self) -> ServerAsync:
+        """Horizon server for the running loop, created on first use since contract calls go through Soroban RPC"""
+        if self._server_override is not None:
+            return self._server_override
+        state = self._loop_state()
+        if state["server"] is None:
+            state["server"] = ServerAsync(
+                self.horizon_url,
+                client=AiohttpClient(
+                    pool_size=settings.ORACLE_HTTP_POOL_SIZE,
+                    request_timeout=settings.ORACLE_HTTP_CONNECT_TIMEOUT + settings.ORACLE_HTTP_READ_TIMEOUT
+                )
+            )
+        return state["server"]
+    
+    @server.setter
+    def server(self, server: ServerAsync) -> None:
+        """Use an externally managed Horizon server"""
+        self._server_override = server
+    
+    @property
+    def _http(self) -> httpx.AsyncClient:
+        """
+        Pooled HTTP/2 client, so connections and TLS sessions are reused across calls
+        
+        Created lazily for the running loop, and recreated if it was closed
+        (e.g. after an app shutdown/startup cycle).
+        """
+        if self._http_override is not None:
+            return self._http_override
+        state = self._loop_state()
+        if state["http"] is None or state["http"].is_closed:
+            state["http"] = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=settings.ORACLE_HTTP_POOL_SIZE,
+                    max_keepalive_connections=settings.ORACLE_HTTP_POOL_SIZE // 2,
+                    keepalive_expiry=30
+                ),
+                timeout=httpx.Timeout(
+                    connect=settings.ORACLE_HTTP_CONNECT_TIMEOUT,
+                    read=settings.ORACLE_HTTP_READ_TIMEOUT,
+                    write=settings.ORACLE_HTTP_READ_TIMEOUT,
+                    pool=settings.ORACLE_HTTP_POOL_TIMEOUT
+                )
+            )
+        return state["http"]
+    
+    @_http.setter
+    def _http(self, client: httpx.AsyncClient) -> None:
+        """Use an externally managed HTTP client"""
+        self._http_override = client
+    
+    def _loop_state(self) -> Dict[str, Any]:
+        """Semaphore, in-flight lookups and HTTP clients for the running loop, created on first use"""
+        loop = asyncio.get_running_loop()
+        state = self._loop_states.get(loop)
+        if state is None:
+            state = {
+                "semaphore": asyncio.Semaphore(settings.ORACLE_MAX_CONCURRENCY),
+                "inflight": {},
+                "http": None,
+                "server": None
+            }
+            self._loop_states[loop] = state
+        return state
+    
+    @property
+    def _fetch_semaphore(self) -> asyncio.Semaphore:
+        """Bounds concurrent outbound price fetches so fan-outs don't trip Horizon/Soroban rate limits"""
+        return self._loop_state()["semaphore"]
+    
+    @property
+    def _inflight(self) -> Dict[str, asyncio.Future]:
+        """Lookups in flight, so concurrent callers asking for the same thing await one fetch"""
+        return self._loop_state()["inflight"]
+    
+    async def close(self):
+        """Close the running loop's pooled HTTP connections"""
+        state = self._loop_states.get(asyncio.get_running_loop())
+        if state is None:
+            return
+        if state["http"] is not None:
+            await state["http"].aclose()
+            state["http"] = None
+        if state["server"] is not None:
+            await state["server"].close()
+            state["server"] = None
     
     async def get_asset_price(self, asset_code: str, asset_issuer: Optional[str] = None) -> Optional[float]:
         """
@@ -60,80 +317,503 @@ class StellarOracleClient:
         Returns:
             Current price in USD or None if not found
         """
+        asset_id = self._asset_id(asset_code, asset_issuer)
+        
+        price = self.stable_pegs.get(asset_id)
+        if price is not None:
+            return price
+        
+        price = self._get_local_price(asset_id)
+        if price is not None:
+            return price
+        
+        return await self._coalesce(
+            f"price:{asset_id}",
+            lambda: self._load_asset_price(asset_code, asset_issuer, asset_id)
+        )
+    
+    async def _load_asset_price(self, asset_code: str, asset_issuer: Optional[str], asset_id: str) -> Optional[float]:
+        """Fetch a price under the concurrency limit and keep it in the in-process cache"""
+        async with self._fetch_semaphore:
+            price = await self._fetch_asset_price(asset_code, asset_issuer, asset_id)
+        if price is not None:
+            self._set_local_price(asset_id, price)
+        return price
+    
+    async def _coalesce(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a lookup once per key at a time, sharing its result with concurrent callers
+        
+        Args:
+            key: Identifies the lookup (e.g. 'price:XLM')
+            factory: Starts the lookup when none is in flight for this key
+            
+        Returns:
+            Result of the in-flight or newly started lookup
+        """
+        while (future := self._inflight.get(key)) is not None:
+            try:
+                # Shield so a cancelled waiter doesn't cancel the shared lookup
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Only this waiter's own cancellation propagates; if the caller
+                # running the lookup was cancelled, retry and take it over
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
         try:
-            # Build asset identifier for cache
-            asset_id = asset_code
-            if asset_issuer:
-                asset_id = f"{asset_code}:{asset_issuer}"
+            result = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved so a future nobody else awaited doesn't log a warning
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+    
+    @staticmethod
+    def _asset_id(asset_code: str, asset_issuer: Optional[str] = None) -> str:
+        """Build the identifier used for cache keys and batch lookups"""
+        return f"{asset_code}:{asset_issuer}" if asset_issuer else asset_code
+    
+    @staticmethod
+    def _price_key(asset_id: str) -> str:
+        """Redis key for an asset's current price"""
+        return f"oracle:price:{asset_id}"
+    
+    @staticmethod
+    def _history_key(asset_id: str, period: str, interval: str) -> str:
+        """Redis key for an asset's price history"""
+        return f"oracle:history:{asset_id}:{period}:{interval}"
+    
+    def _get_local_price(self, asset_id: str) -> Optional[float]:
+        """Get a price from the in-process cache if it has not expired"""
+        entry = self._price_cache.get(asset_id)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+    
+    def _set_local_price(self, asset_id: str, price: float) -> None:
+        """Store a price in the in-process cache, evicting old entries when full"""
+        now = time.monotonic()
+        if asset_id not in self._price_cache and len(self._price_cache) >= self.price_cache_size:
+            expired = [key for key, (_, expiry) in self._price_cache.items() if expiry <= now]
+            for key in expired:
+                del self._price_cache[key]
+            if len(self._price_cache) >= self.price_cache_size:
+                # Dicts keep insertion order, so this drops the oldest entry
+                del self._price_cache[next(iter(self._price_cache))]
+        self._price_cache[asset_id] = (price, now + self.price_cache_ttl)
+    
+    @staticmethod
+    def _source_key(asset_id: str) -> str:
+        """Redis key for the contract source that last priced an asset"""
+        return f"oracle:source:{asset_id}"
+    
+    def _learned_source(self, asset_id: str) -> Optional[str]:
+        """Contract type that last priced an asset, if known"""
+        hint = self._source_hint.get(asset_id)
+        if hint is None:
+            hint = cache_service.get(self._source_key(asset_id))
+            if hint not in self.contracts:
+                return None
+            self._source_hint[asset_id] = hint
+        return hint
+    
+    def _learn_source(self, asset_id: str, contract_type: str) -> None:
+        """Remember the contract source that priced an asset"""
+        if self._source_hint.get(asset_id) != contract_type:
+            self._source_hint[asset_id] = contract_type
+            cache_service.set(self._source_key(asset_id), contract_type, ttl_seconds=self.SOURCE_HINT_TTL)
+    
+    def _forget_source(self, asset_id: str) -> None:
+        """Drop a learned source after it failed to price the asset"""
+        if self._source_hint.pop(asset_id, None) is not None:
+            cache_service.delete(self._source_key(asset_id))
+    
+    def _source_available(self, contract_id: str) -> bool:
+        """Check whether a contract source's circuit breaker lets calls through"""
+        state = self._breaker.get(contract_id)
+        return state is None or state["open_until"] <= time.monotonic()
+    
+    def _record_source_success(self, contract_id: str) -> None:
+        """Reset a contract source's circuit breaker after a successful call"""
+        state = self._breaker.get(contract_id)
+        if state and state["fails"]:
+            if state["fails"] >= self.BREAKER_FAILURE_THRESHOLD:
+                logger.warning("Circuit closed for contract %s", contract_id)
+            state["fails"] = 0
+            state["open_until"] = 0.0
+    
+    def _record_source_failure(self, contract_id: str) -> None:
+        """Count a failed call and open the circuit once the threshold is reached"""
+        state = self._breaker.setdefault(contract_id, {"fails": 0, "open_until": 0.0})
+        state["fails"] += 1
+        if state["fails"] >= self.BREAKER_FAILURE_THRESHOLD:
+            state["open_until"] = time.monotonic() + self.BREAKER_COOL_OFF_SECONDS
+            logger.warning(
+                "Circuit open for contract %s after %s failures, skipping it for %ss",
+                contract_id, state["fails"], self.BREAKER_COOL_OFF_SECONDS
+            )
+    
+    async def _fetch_asset_price(
+        self,
+        asset_code: str,
+        asset_issuer: Optional[str],
+        asset_id: str,
+        use_cache: bool = True
+    ) -> Optional[float]:
+        """
+        Get price for an asset from Redis, the Reflector contracts or the fallbacks
+        
+        Args:
+            asset_code: Asset code
+            asset_issuer: Asset issuer address
+            asset_id: Precomputed asset identifier
+            use_cache: Whether to answer from Redis when it holds a price
             
+        Returns:
+            Price in USD or None if not found
+        """
+        try:
             # Check cache first
-            cache_key = f"price:{asset_id}"
-            cached_price = cache_service.get(cache_key)
-            if cached_price is not None:
-                logger.info(f"Price cache hit for {asset_id}: ${cached_price}")
-                return float(cached_price)
-            
-            # Try different contract sources in order of preference
-            # Priority 1: Stellar Pubnet (for Stellar assets like XLM, USDC)
-            # Priority 2: External CEX & DEX (fallback for all assets)
-            # Priority 3: Fiat exchange rates (for fiat currencies)
-            contracts_to_try = [
-                ("stellar_dex", "Stellar Pubnet prices"),
-                ("external_cex", "External CEX/DEX prices"),
-                ("fiat", "Fiat exchange rates")
-            ]
+            if use_cache:
+                cached = cache_service.get(self._price_key(asset_id))
+                if cached == self.PRICE_MISS:
+                    logger.info("Cached miss for %s, skipping price sources", asset_id)
+                    return None
+                if cached is not None:
+                    return self._serve_cached_price(asset_code, asset_issuer, asset_id, cached)
             
-            for contract_type, description in contracts_to_try:
+            # Ask the source that last priced this asset on its own first; in
+            # steady state that is the only contract call
+            learned = self._learned_source(asset_id)
+            if learned is not None:
+                description = dict(self.CONTRACT_SOURCES)[learned]
                 try:
-                    contract_id = self.contracts[contract_type]
-                    logger.info(f"Trying to get price for {asset_id} from {description} (contract: {contract_id})")
-                    
-                    # Try to call the contract
-                    price = await self._call_contract_price(contract_id, asset_code, asset_issuer)
+                    price = await self._call_contract_price(self.contracts[learned], asset_code, asset_issuer)
                     if price is not None:
-                        # Cache the result for 5 minutes
-                        cache_service.set(cache_key, price, ttl_seconds=300)
-                        logger.info(f"Got price from {description}: ${price}")
+                        self._cache_price(asset_id, price)
+                        logger.info("Got price from %s: $%s", description, price)
                         return price
-                        
                 except Exception as e:
-                    logger.warning(f"Failed to get price from {description}: {str(e)}")
-                    continue
+                    logger.warning("Failed to get price from %s: %s", description, e)
+                self._forget_source(asset_id)
             
-            # Skip Reflector API for now - will be implemented later
-            logger.info(f"Skipping Reflector API for {asset_id} - not implemented yet")
+            # Query the other contract sources concurrently, then take the price
+            # from the most preferred one, so a miss costs one round trip
+            # instead of one per source
+            sources = tuple(source for source in self.CONTRACT_SOURCES if source[0] != learned)
+            tasks = []
             
-            # Final fallback to DEX trades
-            logger.info(f"Trying DEX trades fallback for {asset_id}")
-            try:
-                price = await self._get_price_from_dex_trades(asset_code, asset_issuer)
-                if price is not None:
-                    # Cache the result for 2 minutes (DEX data is less reliable)
-                    cache_service.set(cache_key, price, ttl_seconds=120)
-                    logger.info(f"Got price from DEX trades: ${price}")
-                    return price
-            except Exception as e:
-                logger.warning(f"DEX trades fallback failed: {str(e)}")
+            # Speculatively start the DEX fallback too, so its Horizon latency
+            # overlaps the contract calls instead of following them
+            dex_task = None
+            if self.speculate_dex:
+                dex_task = asyncio.create_task(self._get_price_from_dex_trades(asset_code, asset_issuer))
             
-            # Final fallback to hardcoded prices
-            if asset_code.upper() == "XLM":
-                price = 0.12  # Fallback XLM price
-                logger.warning(f"Using fallback price for {asset_code}: ${price}")
-                cache_service.set(cache_key, price, ttl_seconds=300)
-                return price
-            elif asset_code.upper() == "USDC":
-                price = 1.0  # USDC is always $1
-                logger.warning(f"Using fallback price for {asset_code}: ${price}")
-                cache_service.set(cache_key, price, ttl_seconds=300)
-                return price
+            for contract_type, description in sources:
+                contract_id = self.contracts[contract_type]
+                logger.info("Trying to get price for %s from %s (contract: %s)", asset_id, description, contract_id)
+                tasks.append(asyncio.create_task(self._call_contract_price(contract_id, asset_code, asset_issuer)))
             
-            logger.warning(f"No price data found for {asset_id} from any source")
-            return None
+            use_fallback = False
+            try:
+                for (contract_type, description), task in zip(sources, tasks):
+                    try:
+                        price = await task
+                        if price is not None:
+                            self._cache_price(asset_id, price)
+                            self._learn_source(asset_id, contract_type)
+                            logger.info("Got price from %s: $%s", description, price)
+                            return price
+                            
+                    except Exception as e:
+                        logger.warning("Failed to get price from %s: %s", description, e)
+                use_fallback = True
+            finally:
+                # Lower-priority calls are no longer needed once a price is found
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+                if dex_task is not None and not use_fallback:
+                    dex_task.cancel()
+            
+            return await self._get_fallback_price(asset_code, asset_issuer, asset_id, dex_task)
                 
         except Exception as e:
-            logger.error(f"Error getting price for {asset_code}: {str(e)}")
+            logger.error("Error getting price for %s: %s", asset_code, e)
             return None
     
+    def _cache_price(self, asset_id: str, price: float) -> None:
+        """Store a price in Redis along with when it was fetched"""
+        cache_service.set(
+            self._price_key(asset_id),
+            {"price": price, "ts": time.time()},
+            ttl_seconds=self.price_stale_ttl
+        )
+    
+    def _serve_cached_price(self, asset_code: str, asset_issuer: Optional[str], asset_id: str, cached: Dict) -> float:
+        """
+        Answer from a Redis price entry, refreshing it in the background if stale
+        
+        Args:
+            asset_code: Asset code
+            asset_issuer: Asset issuer address
+            asset_id: Asset identifier
+            cached: Entry written by _cache_price
+            
+        Returns:
+            Cached price in USD
+        """
+        price = float(cached["price"])
+        age = time.time() - cached["ts"]
+        if age < self.price_fresh_ttl:
+            logger.info("Price cache hit for %s: $%s", asset_id, price)
+        else:
+            logger.info("Stale price cache hit for %s (%.0fs old): $%s, refreshing", asset_id, age, price)
+            self._schedule_refresh(asset_code, asset_issuer, asset_id)
+        return price
+    
+    def _schedule_refresh(self, asset_code: str, asset_issuer: Optional[str], asset_id: str) -> None:
+        """Start a background refresh of a stale price unless one is already running"""
+        key = f"refresh:{asset_id}"
+        if key in self._inflight:
+            return
+        task = asyncio.create_task(self._coalesce(key, lambda: self._refresh_price(asset_code, asset_issuer, asset_id)))
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _refresh_price(self, asset_code: str, asset_issuer: Optional[str], asset_id: str) -> None:
+        """Re-fetch a price from its sources, bypassing the Redis entry"""
+        try:
+            async with self._fetch_semaphore:
+                price = await self._fetch_asset_price(asset_code, asset_issuer, asset_id, use_cache=False)
+            if price is not None:
+                self._set_local_price(asset_id, price)
+        except Exception as e:
+            logger.warning("Background price refresh for %s failed: %s", asset_id, e)
+    
+    async def _get_fallback_price(
+        self,
+        asset_code: str,
+        asset_issuer: Optional[str],
+        asset_id: str,
+        dex_task: Optional["asyncio.Task[Optional[float]]"] = None
+    ) -> Optional[float]:
+        """
+        Get price for an asset that no Reflector contract could price
+        
+        Args:
+            asset_code: Asset code
+            asset_issuer: Asset issuer address
+            asset_id: Precomputed asset identifier
+            dex_task: Already running DEX trades lookup to reuse, if any
+            
+        Returns:
+            Price in USD or None if not found
+        """
+        # Skip Reflector API for now - will be implemented later
+        logger.info("Skipping Reflector API for %s - not implemented yet", asset_id)
+        
+        # Final fallback to DEX trades
+        logger.info("Trying DEX trades fallback for %s", asset_id)
+        try:
+            if dex_task is not None:
+                price = await dex_task
+            else:
+                price = await self._get_price_from_dex_trades(asset_code, asset_issuer)
+            if price is not None:
+                self._cache_price(asset_id, price)
+                logger.info("Got price from DEX trades: $%s", price)
+                return price
+        except Exception as e:
+            logger.warning("DEX trades fallback failed: %s", e)
+        
+        # Final fallback to hardcoded prices, matched by code alone since every
+        # live source has already missed this exact asset. Not written to Redis,
+        # so a short outage doesn't serve a made-up price for the stale window
+        price = self.FALLBACK_PRICES.get(asset_code.upper())
+        if price is not None:
+            logger.warning("Using fallback price for %s: $%s", asset_code, price)
+            return price
+        
+        logger.warning("No price data found for %s from any source", asset_id)
+        cache_service.set(self._price_key(asset_id), self.PRICE_MISS, ttl_seconds=self.PRICE_MISS_TTL)
+        return None
+    
+    async def _batch_price_from_contract(
+        self,
+        contract_id: str,
+        assets: Dict[str, Tuple[str, Optional[str]]]
+    ) -> Dict[str, float]:
+        """
+        Query a single contract source for a batch of assets in one JSON-RPC batch
+        
+        Args:
+            contract_id: Contract ID to call
+            assets: Mapping of asset_id to (asset_code, asset_issuer)
+            
+        Returns:
+            Mapping of asset_id to price for the assets the contract could price
+        """
+        if not self._source_available(contract_id):
+            logger.info("Skipping contract %s - circuit open", contract_id)
+            return {}
+        
+        payloads = []
+        request_ids = {}
+        for asset_id, (asset_code, asset_issuer) in assets.items():
+            payload = self._build_price_payload(len(payloads) + 1, contract_id, asset_code, asset_issuer)
+            if payload is not None:
+                request_ids[payload["id"]] = asset_id
+                payloads.append(payload)
+        
+        if not payloads:
+            return {}
+        
+        # Providers cap JSON-RPC batch sizes, so large batches are split into
+        # chunks that are sent concurrently
+        chunks = [
+            payloads[i:i + self.max_batch_size]
+            for i in range(0, len(payloads), self.max_batch_size)
+        ]
+        results = await asyncio.gather(
+            *(self._soroban_batch(chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+        
+        responses = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Soroban batch call failed for %s: %s", contract_id, result)
+            else:
+                responses.extend(result)
+        
+        if all(isinstance(result, Exception) for result in results):
+            self._record_source_failure(contract_id)
+            return {}
+        self._record_source_success(contract_id)
+        
+        # Batch responses are not guaranteed to come back in request order
+        found = {}
+        for response in responses:
+            asset_id = request_ids.get(response.id)
+            if asset_id is None:
+                continue
+            price = self._parse_price_response(response)
+            if price is not None:
+                found[asset_id] = price
+        return found
+    
+    async def _soroban_batch(self, payloads: List[Dict]) -> List[SimulateResponse]:
+        """
+        Send several JSON-RPC requests to Soroban RPC in a single HTTP call
+        
+        Args:
+            payloads: JSON-RPC request objects, each with a unique id
+            
+        Returns:
+            List of JSON-RPC response objects (in any order)
+        """
+        response = await self._http.post(
+            self.soroban_rpc_url,
+            content=orjson.dumps(payloads),
+            headers={"Content-Type": "application/json"}
+        )
+        if response.status_code != 200:
+            raise ValueError(f"Soroban RPC batch call failed with status {response.status_code}")
+        
+        try:
+            return _SIMULATE_BATCH_DECODER.decode(response.content)
+        except msgspec.ValidationError:
+            # Some providers answer a rejected batch with a single error object
+            error = _SIMULATE_DECODER.decode(response.content).error
+            raise ValueError(f"Unexpected Soroban RPC batch response: {error or 'Unknown error'}")
+    
+    def _build_price_payload(
+        self,
+        request_id: int,
+        contract_id: str,
+        asset_code: str,
+        asset_issuer: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Build the simulateTransaction JSON-RPC request for a Reflector lastprice call
+        
+        Args:
+            request_id: JSON-RPC request id
+            contract_id: Contract ID to call
+            asset_code: Asset code
+            asset_issuer: Asset issuer address
+            
+        Returns:
+            JSON-RPC request object or None if the asset can't be identified
+        """
+        # Build asset for contract call
+        if asset_code.upper() == "XLM":
+            # Native XLM asset - use Stellar(address) format
+            asset_arg = self._NATIVE_ASSET_ARG
+        else:
+            # Issued asset - use Stellar(address) format
+            if not asset_issuer:
+                logger.error("Asset issuer required for %s", asset_code)
+                return None
+            asset_arg = {"type": "address", "value": {"type": "Stellar", "address": asset_issuer}}
+        
+        # Prepare the contract call payload for Soroban RPC
+        # Using the lastprice function from Reflector Oracle contract. The
+        # static transaction fields are shared, not copied - the payload is
+        # only ever serialized, never mutated
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": "simulateTransaction",
+            "params": {
+                "transaction": {
+                    **self._SIMULATION_TX_FIELDS,
+                    "operations": [
+                        {
+                            "type": "invokeHostFunction",
+                            "function": "lastprice",
+                            "contractId": contract_id,
+                            "args": [asset_arg]
+                        }
+                    ]
+                }
+            }
+        }
+    
+    def _parse_price_response(self, response: SimulateResponse) -> Optional[float]:
+        """
+        Extract the price from a simulateTransaction JSON-RPC response
+        
+        Args:
+            response: Decoded JSON-RPC response
+            
+        Returns:
+            Price in USD or None if the contract returned no price
+        """
+        result = response.result
+        if result is not None and result.success:
+            # The result should contain PriceData with price and timestamp
+            price_data = result.result
+            if price_data is not None and price_data.price is not None:
+                # Price is in i128 format with 14 decimals
+                return int(price_data.price) * self._PRICE_SCALE
+        else:
+            logger.warning("Contract call failed: %s", response.error or 'Unknown error')
+        return None
+    
     async def _call_contract_price(self, contract_id: str, asset_code: str, asset_issuer: Optional[str] = None) -> Optional[float]:
         """
         Call a Soroban contract to get asset price
@@ -154,94 +834,41 @@ class StellarOracleClient:
             else:
                 asset_identifier = f"{asset_code}:{asset_issuer}"
             
+            if not self._source_available(contract_id):
+                logger.info("Skipping contract %s - circuit open", contract_id)
+                return None
+            
             # Try to call the Reflector Oracle contract using direct HTTP calls to Soroban RPC
             try:
-                import httpx
-                import json
-                
-                # Build asset for contract call
-                if asset_code.upper() == "XLM":
-                    # Native XLM asset - use Stellar(address) format
-                    asset_data = {
-                        "type": "Stellar",
-                        "address": "CDLZFC3SYJYDZT7K67VZ75HPJVIEUVNIXF47ZG2FB2RMQQAHHXCN3A3A"  # Native XLM address
-                    }
-                else:
-                    # Issued asset - use Stellar(address) format
-                    if not asset_issuer:
-                        logger.error(f"Asset issuer required for {asset_code}")
-                        return None
-                    asset_data = {
-                        "type": "Stellar", 
-                        "address": asset_issuer
-                    }
-                
-                # Prepare the contract call payload for Soroban RPC
-                # Using the lastprice function from Reflector Oracle contract
-                payload = {
-                    "jsonrpc": "2.0",
-                    "id": 1,
-                    "method": "simulateTransaction",
-                    "params": {
-                        "transaction": {
-                            "sourceAccount": "GAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAWHF",  # Dummy account for simulation
-                            "fee": "100",
-                            "sequence": "0",
-                            "operations": [
-                                {
-                                    "type": "invokeHostFunction",
-                                    "function": "lastprice",
-                                    "contractId": contract_id,
-                                    "args": [
-                                        {
-                                            "type": "address",
-                                            "value": asset_data
-                                        }
-                                    ]
-                                }
-                            ],
-                            "timeBounds": {
-                                "minTime": "0",
-                                "maxTime": "0"
-                            }
-                        }
-                    }
-                }
+                payload = self._build_price_payload(1, contract_id, asset_code, asset_issuer)
+                if payload is None:
+                    return None
                 
                 # Make HTTP call to Soroban RPC endpoint
-                soroban_rpc_url = self.soroban_rpc_url
+                response = await self._http.post(
+                    self.soroban_rpc_url,
+                    content=orjson.dumps(payload),
+                    headers={"Content-Type": "application/json"}
+                )
                 
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        soroban_rpc_url,
-                        json=payload,
-                        headers={"Content-Type": "application/json"},
-                        timeout=10.0
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        
-                        if "result" in result and result["result"].get("success"):
-                            # Extract price from the result
-                            # The result should contain PriceData with price and timestamp
-                            price_data = result["result"].get("result", {})
-                            
-                            if price_data and "price" in price_data:
-                                # Price is in i128 format with 14 decimals
-                                price_raw = int(price_data["price"])
-                                decimals = 14  # Reflector Oracle uses 14 decimals
-                                price = price_raw / (10 ** decimals)
-                                
-                                logger.info(f"Got price from contract {contract_id}: {asset_code} = ${price}")
-                                return price
-                        else:
-                            logger.warning(f"Contract call failed: {result.get('error', 'Unknown error')}")
-                    else:
-                        logger.warning(f"Soroban RPC call failed with status {response.status_code}")
+                if response.status_code == 200:
+                    decoded = _SIMULATE_DECODER.decode(response.content)
+                    price = self._parse_price_response(decoded)
+                    if price is not None:
+                        # Only a decoded price counts as the source working
+                        self._record_source_success(contract_id)
+                        logger.info("Got price from contract %s: %s = $%s", contract_id, asset_code, price)
+                        return price
+                    if decoded.error is not None or decoded.result is None or not decoded.result.success:
+                        # An error answer, as opposed to the contract having no price for the asset
+                        self._record_source_failure(contract_id)
+                else:
+                    logger.warning("Soroban RPC call failed with status %s", response.status_code)
+                    self._record_source_failure(contract_id)
                 
             except Exception as contract_error:
-                logger.warning(f"Soroban contract call failed for {contract_id}: {str(contract_error)}")
+                logger.warning("Soroban contract call failed for %s: %s", contract_id, contract_error)
+                self._record_source_failure(contract_id)
                 
                 # Try alternative method - direct HTTP call to Reflector API
                 try:
@@ -249,13 +876,13 @@ class StellarOracleClient:
                     if price:
                         return price
                 except Exception as api_error:
-                    logger.warning(f"Reflector API fallback failed: {str(api_error)}")
+                    logger.warning("Reflector API fallback failed: %s", api_error)
             
-            logger.info(f"Contract call to {contract_id} for {asset_identifier} - no price data available")
+            logger.info("Contract call to %s for %s - no price data available", contract_id, asset_identifier)
             return None
             
         except Exception as e:
-            logger.error(f"Contract call failed for {contract_id}: {str(e)}")
+            logger.error("Contract call failed for %s: %s", contract_id, e)
             return None
     
     async def _get_price_from_reflector_api(self, contract_id: str, asset_code: str, asset_issuer: Optional[str] = None) -> Optional[float]:
@@ -271,8 +898,6 @@ class StellarOracleClient:
             Price in USD or None if failed
         """
         try:
-            import httpx
-            
             # Build asset identifier for API call
             if asset_code.upper() == "XLM":
                 asset_identifier = "XLM"
@@ -283,20 +908,19 @@ class StellarOracleClient:
             # Using the correct Reflector API endpoint
             api_url = f"{settings.REFLECTOR_API_URL}/v1/price/{asset_identifier}"
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(api_url, timeout=10.0)
-                if response.status_code == 200:
-                    data = response.json()
-                    if "price" in data:
-                        price = float(data["price"])
-                        logger.info(f"Got price from Reflector API: {asset_code} = ${price}")
-                        return price
+            response = await self._http.get(api_url)
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                if "price" in data:
+                    price = float(data["price"])
+                    logger.info("Got price from Reflector API: %s = $%s", asset_code, price)
+                    return price
             
-            logger.warning(f"Reflector API returned no price for {asset_identifier}")
+            logger.warning("Reflector API returned no price for %s", asset_identifier)
             return None
             
         except Exception as e:
-            logger.warning(f"Reflector API call failed: {str(e)}")
+            logger.warning("Reflector API call failed: %s", e)
             return None
     
     async def _get_price_from_dex_trades(self, asset_code: str, asset_issuer: Optional[str] = None) -> Optional[float]:
@@ -311,55 +935,32 @@ class StellarOracleClient:
             Price in USD or None if failed
         """
         try:
-            # Create asset object
-            if asset_code.upper() == "XLM":
-                base_asset = Asset.native()
-            else:
-                base_asset = Asset(asset_code, asset_issuer)
+            base_asset = _stellar_asset(asset_code, asset_issuer)
             
             # Get recent trades for XLM pair
-            counter_asset = Asset.native()  # Always pair with XLM
+            counter_asset = _XLM_ASSET  # Always pair with XLM
             
             # Get recent trades
-            trades = self.server.trades().for_asset_pair(
+            trades = await self.server.trades().for_asset_pair(
                 base_asset, counter_asset
             ).order(desc=True).limit(10).call()
             
-            # Handle different response formats
-            if hasattr(trades, 'records'):
-                records = trades.records
-            elif isinstance(trades, dict) and '_embedded' in trades:
-                records = trades['_embedded'].get('records', [])
-            else:
-                logger.warning(f"Unexpected response format for {asset_code}: {type(trades)}")
+            records = self._normalize_trades(trades)
+            if records is None:
+                logger.warning("Unexpected response format for %s: %s", asset_code, type(trades))
                 return None
                 
             if not records:
-                logger.warning(f"No trades found for {asset_code}")
+                logger.warning("No trades found for %s", asset_code)
                 return None
             
-            # Calculate weighted average price
-            total_volume = 0
-            weighted_price = 0
-            
-            for trade in records:
-                # Handle both object and dict formats
-                if hasattr(trade, 'base_amount'):
-                    volume = float(trade.base_amount)
-                    price = float(trade.price)
-                elif isinstance(trade, dict):
-                    volume = float(trade.get('base_amount', 0))
-                    price = float(trade.get('price', 0))
-                else:
-                    continue
-                
-                total_volume += volume
-                weighted_price += price * volume
-            
+            # Calculate volume-weighted average price
+            _, volumes, prices = self._trade_arrays(records)
+            total_volume = volumes.sum()
             if total_volume == 0:
                 return None
             
-            avg_price = weighted_price / total_volume
+            avg_price = float(np.dot(prices, volumes) / total_volume)
             
             # Convert from XLM to USD (this is a rough conversion)
             # In a real implementation, you'd get XLM/USD price from another source
@@ -368,31 +969,159 @@ class StellarOracleClient:
                 return None
             
             usd_price = avg_price * xlm_usd_price
-            logger.info(f"DEX price for {asset_code}: {avg_price} XLM = ${usd_price} USD")
+            logger.info("DEX price for %s: %s XLM = $%s USD", asset_code, avg_price, usd_price)
             
             return usd_price
             
         except Exception as e:
-            logger.error(f"Failed to get DEX price for {asset_code}: {str(e)}")
+            logger.error("Failed to get DEX price for %s: %s", asset_code, e)
+            return None
+    
+    async def _fetch_trades_since(
+        self,
+        base_asset: Asset,
+        cursor: Optional[str],
+        start_time: datetime
+    ) -> Tuple[List[Dict], Optional[str], Optional[float]]:
+        """
+        Page through Horizon trades for an asset/XLM pair
+        
+        With a cursor, pages forward from it so only new trades are fetched.
+        Without one, pages back from the newest trade until start_time.
+        
+        Args:
+            base_asset: Asset traded against XLM
+            cursor: Paging token of the newest trade already seen, if any
+            start_time: Oldest trade time needed when there is no cursor (naive UTC)
+            
+        Returns:
+            Tuple of (trade records, paging token of the newest trade, close
+            time of the oldest fetched trade if the page cap stopped a fetch
+            without a cursor before start_time, else None)
+        """
+        records = []
+        newest_token = cursor
+        page_cursor = cursor
+        start_ts = start_time.replace(tzinfo=timezone.utc).timestamp()
+        oldest_ts = None
+        truncated_at = None
+        
+        for _ in range(self.HISTORY_MAX_PAGES):
+            builder = self.server.trades().for_asset_pair(base_asset, _XLM_ASSET)
+            if page_cursor is not None:
+                builder = builder.cursor(page_cursor)
+            trades = await builder.order(desc=cursor is None).limit(self.TRADES_PAGE_SIZE).call()
+            
+            page = self._normalize_trades(trades)
+            if page is None:
+                logger.warning("Unexpected trades response format: %s", type(trades))
+                break
+            if not page:
+                break
+            
+            records.extend(page)
+            if cursor is None:
+                if newest_token is None:
+                    newest_token = page[0].get('paging_token')
+                oldest_ts = parse_iso_datetime(page[-1].get('ledger_close_time')).timestamp()
+                if oldest_ts < start_ts:
+                    break
+            else:
+                newest_token = page[-1].get('paging_token')
+            
+            if len(page) < self.TRADES_PAGE_SIZE:
+                break
+            page_cursor = page[-1].get('paging_token')
+        else:
+            # Ran out of pages with more (older) trades still to fetch
+            if cursor is None:
+                truncated_at = oldest_ts
+        
+        return records, newest_token, truncated_at
+    
+    def _add_trades_to_buckets(self, buckets: Dict[str, List[float]], records: List[Dict]) -> None:
+        """
+        Add trades to per-hour [volume, price x volume] sums
+        
+        Args:
+            buckets: Sums keyed by hours since the epoch (as strings, for msgpack)
+            records: Trade dicts from _normalize_trades
+        """
+        close_times, volumes, prices = self._trade_arrays(records)
+        # Parse all close times in one vectorized pass; NumPy wants them
+        # without Horizon's 'Z' UTC suffix
+        stamps = np.array(
+            [close_time[:-1] if close_time.endswith('Z') else close_time for close_time in close_times],
+            dtype='datetime64[s]'
+        )
+        hours = stamps.astype(np.int64) // 3600
+        unique_hours, index = np.unique(hours, return_inverse=True)
+        sum_volume = np.bincount(index, weights=volumes)
+        sum_price_volume = np.bincount(index, weights=prices * volumes)
+        
+        for hour, volume, price_volume in zip(unique_hours, sum_volume, sum_price_volume):
+            totals = buckets.setdefault(str(hour), [0.0, 0.0])
+            totals[0] += float(volume)
+            totals[1] += float(price_volume)
+    
+    @staticmethod
+    def _normalize_trades(trades) -> Optional[List[Dict]]:
+        """
+        Extract the trade records of a Horizon response as plain dicts
+        
+        Args:
+            trades: Horizon trades response, in either object or dict format
+            
+        Returns:
+            List of trade dicts, or None if the response format is unexpected
+        """
+        if hasattr(trades, 'records'):
+            records = trades.records
+        elif isinstance(trades, dict) and '_embedded' in trades:
+            records = trades['_embedded'].get('records', [])
+        else:
             return None
+        return [trade if isinstance(trade, dict) else vars(trade) for trade in records]
+    
+    @staticmethod
+    def _trade_arrays(records: List[Dict]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        Extract close times, base volumes and prices from Horizon trade records
+        
+        Args:
+            records: Trade dicts from _normalize_trades
+            
+        Returns:
+            Tuple of (close_times, volumes, prices), aligned by trade
+        """
+        close_times = [trade.get('ledger_close_time', '') for trade in records]
+        volumes = np.asarray([trade.get('base_amount', 0) for trade in records], dtype=np.float64)
+        prices = np.asarray([trade.get('price', 0) for trade in records], dtype=np.float64)
+        return close_times, volumes, prices
     
     async def _get_xlm_usd_price(self) -> Optional[float]:
         """
-        Get XLM/USD price from external source
+        Get XLM/USD price from external source, memoized in the in-process cache
         
         Returns:
             XLM price in USD or None if failed
         """
+        price = self._get_local_price(self.XLM_USD_KEY)
+        if price is not None:
+            return price
+        
         try:
             # Skip Reflector API for now - will be implemented later
             logger.info("Skipping Reflector API for XLM price - not implemented yet")
             
             # Fallback to a hardcoded price (in production, use a reliable price feed)
             logger.warning("Using fallback XLM price")
-            return 0.12  # Fallback price
+            price = 0.12  # Fallback price
+            self._set_local_price(self.XLM_USD_KEY, price)
+            return price
             
         except Exception as e:
-            logger.error(f"Failed to get XLM/USD price: {str(e)}")
+            logger.error("Failed to get XLM/USD price: %s", e)
             return None
     
     async def get_price_history(
@@ -414,37 +1143,48 @@ class StellarOracleClient:
         Returns:
             List of price history data
         """
+        asset_id = self._asset_id(asset_code, asset_issuer)
+        return await self._coalesce(
+            f"history:{asset_id}:{period}:{interval}",
+            lambda: self._load_price_history(asset_code, asset_issuer, asset_id, period, interval)
+        )
+    
+    async def _load_price_history(
+        self,
+        asset_code: str,
+        asset_issuer: Optional[str],
+        asset_id: str,
+        period: str,
+        interval: str
+    ) -> List[Dict]:
+        """Get price history from the cache, the DEX or the fallback data"""
         try:
-            # Build asset identifier for cache
-            asset_id = asset_code
-            if asset_issuer:
-                asset_id = f"{asset_code}:{asset_issuer}"
             
             # Check cache first
-            cache_key = f"history:{asset_id}:{period}:{interval}"
-            cached_history = cache_service.get(cache_key)
+            cache_key = self._history_key(asset_id, period, interval)
+            cached_history = cache_service.get_packed(cache_key)
             if cached_history is not None:
-                logger.info(f"History cache hit for {asset_id}")
+                logger.info("History cache hit for %s", asset_id)
                 return cached_history
             
-            logger.info(f"Getting price history for {asset_id} - period: {period}, interval: {interval}")
+            logger.info("Getting price history for %s - period: %s, interval: %s", asset_id, period, interval)
             
             # Skip Reflector API for now - will be implemented later
-            logger.info(f"Skipping Reflector API history for {asset_id} - not implemented yet")
+            logger.info("Skipping Reflector API history for %s - not implemented yet", asset_id)
             
             # Fallback to DEX trades
             try:
                 history = await self._get_history_from_dex_trades(asset_code, asset_issuer, period, interval)
                 if history:
                     # Cache for 5 minutes (DEX data is less reliable)
-                    cache_service.set(cache_key, history, ttl_seconds=300)
-                    logger.info(f"Got history from DEX trades: {len(history)} points")
+                    cache_service.set_packed(cache_key, history, ttl_seconds=300)
+                    logger.info("Got history from DEX trades: %s points", len(history))
                     return history
             except Exception as e:
-                logger.warning(f"DEX trades history failed: {str(e)}")
+                logger.warning("DEX trades history failed: %s", e)
             
             # Final fallback to mock data
-            logger.warning(f"Using fallback history data for {asset_id}")
+            logger.warning("Using fallback history data for %s", asset_id)
             fallback_data = [
                 {"timestamp": "2024-01-01T00:00:00Z", "price": 0.12},
                 {"timestamp": "2024-01-01T01:00:00Z", "price": 0.13},
@@ -453,9 +1193,43 @@ class StellarOracleClient:
             return fallback_data
                 
         except Exception as e:
-            logger.error(f"Error getting history for {asset_code}: {str(e)}")
+            logger.error("Error getting history for %s: %s", asset_code, e)
             return []
     
+    async def iter_price_history(
+        self,
+        asset_code: str,
+        asset_issuer: Optional[str] = None,
+        period: str = "24h",
+        interval: str = "1h"
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream price history for an asset point by point
+        
+        Unlike get_price_history, freshly computed points are not collected
+        into a list or cached, so long periods can be served incrementally.
+        
+        Args:
+            asset_code: Asset code
+            asset_issuer: Asset issuer address
+            period: Time period (24h, 7d, 30d)
+            interval: Data interval (1h, 4h, 1d)
+            
+        Yields:
+            Price history points in chronological order
+        """
+        asset_id = self._asset_id(asset_code, asset_issuer)
+        
+        cached_history = cache_service.get_packed(self._history_key(asset_id, period, interval))
+        if cached_history is not None:
+            logger.info("History cache hit for %s", asset_id)
+            for point in cached_history:
+                yield point
+            return
+        
+        async for point in self._iter_history_from_dex_trades(asset_code, asset_issuer, period, interval):
+            yield point
+    
     async def _get_history_from_dex_trades(self, asset_code: str, asset_issuer: Optional[str] = None, period: str = "24h", interval: str = "1h") -> List[Dict]:
         """
         Get price history from Stellar DEX trades
@@ -469,17 +1243,28 @@ class StellarOracleClient:
         Returns:
             List of price history data
         """
+        return [point async for point in self._iter_history_from_dex_trades(asset_code, asset_issuer, period, interval)]
+    
+    async def _iter_history_from_dex_trades(self, asset_code: str, asset_issuer: Optional[str] = None, period: str = "24h", interval: str = "1h") -> AsyncIterator[Dict]:
+        """
+        Yield price history points from Stellar DEX trades one interval at a time
+        
+        Args:
+            asset_code: Asset code
+            asset_issuer: Asset issuer address
+            period: Time period
+            interval: Data interval
+            
+        Yields:
+            Price history points in chronological order
+        """
         try:
-            # Create asset object
-            if asset_code.upper() == "XLM":
-                base_asset = Asset.native()
-            else:
-                base_asset = Asset(asset_code, asset_issuer)
+            base_asset = _stellar_asset(asset_code, asset_issuer)
             
             # Get XLM/USD price for conversion
             xlm_usd_price = await self._get_xlm_usd_price()
             if xlm_usd_price is None:
-                return []
+                return
             
             # Calculate time range
             now = datetime.utcnow()
@@ -492,72 +1277,44 @@ class StellarOracleClient:
             else:
                 start_time = now - timedelta(hours=24)
             
-            # Get trades in time range
-            trades = self.server.trades().for_asset_pair(
-                base_asset, Asset.native()
-            ).order(desc=True).limit(200).call()
-            
-            # Handle different response formats
-            if hasattr(trades, 'records'):
-                records = trades.records
-            elif isinstance(trades, dict) and '_embedded' in trades:
-                records = trades['_embedded'].get('records', [])
-            else:
-                logger.warning(f"Unexpected response format for {asset_code}: {type(trades)}")
-                return []
-                
-            if not records:
-                return []
-            
-            # Group trades by time intervals and calculate average prices
-            history = []
-            current_time = start_time
+            # Fetch only the trades the stored history state hasn't seen yet and
+            # fold them into its per-hour bucket sums
+            asset_id = self._asset_id(asset_code, asset_issuer)
+            state_key = f"oracle:history_state:{asset_id}"
+            start_ts = start_time.replace(tzinfo=timezone.utc).timestamp()
+            state = cache_service.get_packed(state_key)
+            if state is None or state["since"] > start_ts:
+                # No state yet, or it doesn't reach back far enough: rebuild it
+                state = {"cursor": None, "since": start_ts, "buckets": {}}
             
-            while current_time < now:
-                next_time = current_time + timedelta(hours=1)  # 1 hour intervals
-                
-                # Find trades in this time window
-                period_trades = []
-                for trade in records:
-                    # Handle both object and dict formats
-                    if hasattr(trade, 'ledger_close_time'):
-                        trade_time = datetime.fromisoformat(trade.ledger_close_time.replace('Z', '+00:00'))
-                    elif isinstance(trade, dict):
-                        trade_time = datetime.fromisoformat(trade.get('ledger_close_time', '').replace('Z', '+00:00'))
-                    else:
-                        continue
-                        
-                    if start_time <= trade_time < next_time:
-                        period_trades.append(trade)
-                
-                if period_trades:
-                    # Calculate weighted average price for this period
-                    total_volume = 0
-                    weighted_price = 0
-                    
-                    for trade in period_trades:
-                        volume = float(trade.base_amount)
-                        price = float(trade.price)
-                        
-                        total_volume += volume
-                        weighted_price += price * volume
-                    
-                    if total_volume > 0:
-                        avg_price_xlm = weighted_price / total_volume
-                        avg_price_usd = avg_price_xlm * xlm_usd_price
-                        
-                        history.append({
-                            "timestamp": current_time.isoformat() + "Z",
-                            "price": avg_price_usd
-                        })
-                
-                current_time = next_time
+            records, cursor, truncated_at = await self._fetch_trades_since(base_asset, state["cursor"], start_time)
+            if records:
+                self._add_trades_to_buckets(state["buckets"], records)
+                oldest_hour = int(time.time() // 3600) - self.HISTORY_RETENTION_HOURS
+                state["buckets"] = {
+                    hour: sums for hour, sums in state["buckets"].items() if int(hour) >= oldest_hour
+                }
+                state["cursor"] = cursor
+                if truncated_at is not None:
+                    # The page cap stopped short of start_time: only claim the
+                    # whole hours after the oldest fetched trade, so a wider
+                    # window rebuilds the state instead of keeping the gap
+                    state["since"] = (int(truncated_at // 3600) + 1) * 3600
+                cache_service.set_packed(state_key, state, ttl_seconds=self.HISTORY_STATE_TTL)
             
-            return history
+            start_hour = int(max(start_ts, state["since"]) // 3600)
+            for hour in sorted(int(hour) for hour in state["buckets"]):
+                if hour < start_hour:
+                    continue
+                sum_volume, sum_price_volume = state["buckets"][str(hour)]
+                if sum_volume > 0:
+                    yield {
+                        "timestamp": datetime.utcfromtimestamp(hour * 3600).isoformat() + "Z",
+                        "price": sum_price_volume / sum_volume * xlm_usd_price
+                    }
             
         except Exception as e:
-            logger.error(f"Failed to get DEX history for {asset_code}: {str(e)}")
-            return []
+            logger.error("Failed to get DEX history for %s: %s", asset_code, e)
     
     async def get_supported_assets(self) -> List[Dict]:
         """
@@ -566,10 +1323,14 @@ class StellarOracleClient:
         Returns:
             List of supported assets with metadata
         """
+        return await self._coalesce("assets", self._load_supported_assets)
+    
+    async def _load_supported_assets(self) -> List[Dict]:
+        """Get supported assets from the cache, the DEX or the known asset list"""
         try:
             # Check cache first
-            cache_key = "supported_assets"
-            cached_assets = cache_service.get(cache_key)
+            cache_key = self.SUPPORTED_ASSETS_KEY
+            cached_assets = cache_service.get_packed(cache_key)
             if cached_assets is not None:
                 logger.info("Supported assets cache hit")
                 return cached_assets
@@ -584,11 +1345,11 @@ class StellarOracleClient:
                 assets = await self._get_assets_from_dex()
                 if assets:
                     # Cache for 30 minutes
-                    cache_service.set(cache_key, assets, ttl_seconds=1800)
-                    logger.info(f"Got {len(assets)} assets from DEX")
+                    cache_service.set_packed(cache_key, assets, ttl_seconds=1800)
+                    logger.info("Got %s assets from DEX", len(assets))
                     return assets
             except Exception as e:
-                logger.warning(f"DEX assets failed: {str(e)}")
+                logger.warning("DEX assets failed: %s", e)
             
             # Final fallback to known assets
             logger.warning("Using fallback supported assets")
@@ -600,7 +1361,7 @@ class StellarOracleClient:
             return fallback_assets
                 
         except Exception as e:
-            logger.error(f"Error getting supported assets: {str(e)}")
+            logger.error("Error getting supported assets: %s", e)
             return []
     
     async def _get_assets_from_dex(self) -> List[Dict]:
@@ -615,35 +1376,20 @@ class StellarOracleClient:
             assets = set()
             
             # Get recent trades to find active assets
-            trades = self.server.trades().order(desc=True).limit(200).call()
+            trades = await self.server.trades().order(desc=True).limit(200).call()
             
-            # Handle different response formats
-            if hasattr(trades, 'records'):
-                records = trades.records
-            elif isinstance(trades, dict) and '_embedded' in trades:
-                records = trades['_embedded'].get('records', [])
-            else:
-                logger.warning(f"Unexpected response format: {type(trades)}")
+            records = self._normalize_trades(trades)
+            if records is None:
+                logger.warning("Unexpected response format: %s", type(trades))
                 return []
             
             for trade in records:
-                # Handle both object and dict formats
-                if hasattr(trade, 'base_asset_type'):
-                    base_asset_type = trade.base_asset_type
-                    base_asset_code = trade.base_asset_code
-                    base_asset_issuer = trade.base_asset_issuer
-                    counter_asset_type = trade.counter_asset_type
-                    counter_asset_code = trade.counter_asset_code
-                    counter_asset_issuer = trade.counter_asset_issuer
-                elif isinstance(trade, dict):
-                    base_asset_type = trade.get('base_asset_type')
-                    base_asset_code = trade.get('base_asset_code')
-                    base_asset_issuer = trade.get('base_asset_issuer')
-                    counter_asset_type = trade.get('counter_asset_type')
-                    counter_asset_code = trade.get('counter_asset_code')
-                    counter_asset_issuer = trade.get('counter_asset_issuer')
-                else:
-                    continue
+                base_asset_type = trade.get('base_asset_type')
+                base_asset_code = trade.get('base_asset_code')
+                base_asset_issuer = trade.get('base_asset_issuer')
+                counter_asset_type = trade.get('counter_asset_type')
+                counter_asset_code = trade.get('counter_asset_code')
+                counter_asset_issuer = trade.get('counter_asset_issuer')
                 
                 # Add base asset
                 if base_asset_type == "native":
@@ -669,12 +1415,13 @@ class StellarOracleClient:
             return asset_list
             
         except Exception as e:
-            logger.error(f"Failed to get assets from DEX: {str(e)}")
+            logger.error("Failed to get assets from DEX: %s", e)
             return []
     
     async def get_multiple_prices(self, assets: List[Dict]) -> Dict[str, float]:
         """
-        Get prices for multiple assets concurrently
+        Get prices for multiple assets, querying each contract source for the
+        whole batch and only passing its misses on to the next source
         
         Args:
             assets: List of asset dictionaries with 'code' and optional 'issuer'
@@ -683,101 +1430,223 @@ class StellarOracleClient:
             Dictionary mapping asset codes to prices
         """
         prices = {}
+        remaining = {}
         
-        # Create tasks for concurrent contract calls
-        tasks = []
         for asset in assets:
-            task = self.get_asset_price(
-                asset["code"], 
-                asset.get("issuer")
-            )
-            tasks.append((asset["code"], task))
+            asset_code = asset["code"]
+            asset_issuer = asset.get("issuer")
+            asset_id = self._asset_id(asset_code, asset_issuer)
+            
+            price = self.stable_pegs.get(asset_id)
+            if price is None:
+                price = self._get_local_price(asset_id)
+            if price is None:
+                cached = cache_service.get(self._price_key(asset_id))
+                if cached == self.PRICE_MISS:
+                    continue
+                if cached is not None:
+                    price = self._serve_cached_price(asset_code, asset_issuer, asset_id, cached)
+                    self._set_local_price(asset_id, price)
+            
+            if price is not None:
+                prices[asset_code] = price
+            else:
+                remaining[asset_id] = (asset_code, asset_issuer)
         
-        # Execute all calls concurrently
-        for asset_code, task in tasks:
-            try:
-                price = await task
+        # Waterfall over contract sources: each one only sees the previous misses
+        for contract_type, description in self.CONTRACT_SOURCES:
+            if not remaining:
+                break
+            
+            async with self._fetch_semaphore:
+                found = await self._batch_price_from_contract(self.contracts[contract_type], remaining)
+            logger.info("%s: priced %s of %s assets", description, len(found), len(remaining))
+            
+            for asset_id, price in found.items():
+                asset_code, _ = remaining.pop(asset_id)
+                self._cache_price(asset_id, price)
+                self._set_local_price(asset_id, price)
+                prices[asset_code] = price
+        
+        # Assets no contract could price go through the DEX/hardcoded fallbacks,
+        # all at once, each bounded by its own timeout
+        if remaining:
+            async with asyncio.TaskGroup() as tg:
+                jobs = [
+                    (asset_code, tg.create_task(self._load_fallback_price(asset_code, asset_issuer, asset_id)))
+                    for asset_id, (asset_code, asset_issuer) in remaining.items()
+                ]
+            for asset_code, job in jobs:
+                price = job.result()
                 if price is not None:
                     prices[asset_code] = price
-            except Exception as e:
-                logger.error(f"Error getting price for {asset_code}: {str(e)}")
         
         return prices
     
-    async def health_check(self) -> bool:
+    async def _load_fallback_price(self, asset_code: str, asset_issuer: Optional[str], asset_id: str) -> Optional[float]:
+        """
+        Run the fallback lookup for one asset of a multi-asset request
+        
+        Errors and timeouts are logged and reported as a missing price, so one
+        slow asset can't fail or hold up the rest of the batch.
+        
+        Args:
+            asset_code: Asset code
+            asset_issuer: Asset issuer address
+            asset_id: Asset identifier used for cache keys
+            
+        Returns:
+            Price in USD or None if not found
+        """
+        try:
+            async with self._fetch_semaphore:
+                price = await asyncio.wait_for(
+                    self._get_fallback_price(asset_code, asset_issuer, asset_id),
+                    timeout=self.FALLBACK_TIMEOUT
+                )
+        except asyncio.TimeoutError:
+            logger.warning("Fallback price lookup for %s timed out", asset_code)
+            return None
+        except Exception as e:
+            logger.error("Error getting price for %s: %s", asset_code, e)
+            return None
+        
+        if price is not None:
+            self._set_local_price(asset_id, price)
+        return price
+    
+    async def health_check(self) -> Dict:
         """
         Check if the oracle services are accessible
         
+        Pings Horizon, the Soroban RPC and Redis and simulates one lastprice
+        read on the external_cex contract, all concurrently instead of running
+        a full price fetch, so the check costs a single round trip.
+        Healthy results are reused for a few seconds; failures never are.
+        
         Returns:
-            True if services are accessible, False otherwise
+            Dict with the overall status and per-component results
         """
+        if self._health_cache is not None:
+            checked_at, cached_result = self._health_cache
+            if time.monotonic() - checked_at < self.health_cache_ttl:
+                return {**cached_result, "served_from_cache": True}
+        
         try:
             logger.info("Checking Stellar Oracle health...")
             
+            # The Redis client is synchronous, so its ping runs in a thread
+            horizon_result, soroban_result, sentinel_result, cache_result = await asyncio.gather(
+                asyncio.wait_for(
+                    self.server.ledgers().order(desc=True).limit(1).call(),
+                    timeout=self.HEALTH_CHECK_TIMEOUT
+                ),
+                asyncio.wait_for(self._soroban_health(), timeout=self.HEALTH_CHECK_TIMEOUT),
+                asyncio.wait_for(self._sentinel_price_read(), timeout=self.HEALTH_CHECK_TIMEOUT),
+                asyncio.wait_for(asyncio.to_thread(cache_service.is_connected), timeout=self.HEALTH_CHECK_TIMEOUT),
+                return_exceptions=True
+            )
+            
             # Check Horizon connection
-            try:
-                # Test Horizon connection
-                self.server.ledgers().order(desc=True).limit(1).call()
-                logger.info("Horizon connection: OK")
-            except Exception as e:
-                logger.error(f"Horizon connection failed: {str(e)}")
+            if isinstance(horizon_result, BaseException):
+                logger.error("Horizon connection failed: %s", horizon_result)
                 return {
                     "status": "unhealthy",
                     "horizon_connection": False,
+                    "soroban_rpc": False,
+                    "contracts_configured": False,
+                    "contract_read": False,
                     "cache_service": False,
-                    "end_to_end_test": False,
-                    "error": str(e)
+                    "error": str(horizon_result)
                 }
+            logger.info("Horizon connection: OK")
             
-            # Check contract IDs configuration
-            if not all(self.contracts.values()):
-                logger.warning("Not all Reflector contract IDs are configured")
+            # Check Soroban RPC, which serves the Reflector contract calls
+            soroban_healthy = soroban_result is True
+            if soroban_healthy:
+                logger.info("Soroban RPC: OK")
             else:
-                logger.info("Contract IDs configured: OK")
+                logger.warning("Soroban RPC health check failed: %s", soroban_result)
             
-            # Skip Reflector API check for now - will be implemented later
-            logger.info("Skipping Reflector API health check - not implemented yet")
+            contracts_configured = self._contracts_configured
             
-            # Check cache service
-            try:
-                cache_connected = cache_service.is_connected()
-                if cache_connected:
-                    logger.info("Cache service: OK")
-                else:
-                    logger.warning("Cache service: Not connected")
-            except Exception as e:
-                logger.warning(f"Cache service check failed: {str(e)}")
+            # Check that a Reflector contract actually answers a price read
+            contract_read = sentinel_result is True
+            if contract_read:
+                logger.info("Reflector contract read: OK")
+            else:
+                logger.warning("Reflector contract read failed: %s", sentinel_result)
             
-            # Try to get a simple price to test end-to-end functionality
-            test_price = await self.get_asset_price("XLM")
-            if test_price is not None:
-                logger.info(f"End-to-end test passed - XLM price: ${test_price}")
-                return {
-                    "status": "healthy",
-                    "horizon_connection": True,
-                    "cache_service": cache_connected,
-                    "end_to_end_test": True,
-                    "test_price": test_price
-                }
+            # Check cache service
+            cache_connected = cache_result is True
+            if cache_connected:
+                logger.info("Cache service: OK")
+            elif isinstance(cache_result, BaseException):
+                logger.warning("Cache service check failed: %s", cache_result)
             else:
-                logger.warning("End-to-end test failed - could not get test price")
-                return {
-                    "status": "degraded",
-                    "horizon_connection": True,
-                    "cache_service": cache_connected,
-                    "end_to_end_test": False,
-                    "test_price": None
-                }
+                logger.warning("Cache service: Not connected")
+            
+            result = {
+                "status": "healthy" if soroban_healthy and contracts_configured and contract_read else "degraded",
+                "horizon_connection": True,
+                "soroban_rpc": soroban_healthy,
+                "contracts_configured": contracts_configured,
+                "contract_read": contract_read,
+                "cache_service": cache_connected
+            }
+            if result["status"] == "healthy":
+                self._health_cache = (time.monotonic(), result)
+            return result
                 
         except Exception as e:
-            logger.error(f"Health check failed: {str(e)}")
+            logger.error("Health check failed: %s", e)
             return {
                 "status": "unhealthy",
                 "error": str(e),
                 "horizon_connection": False,
-                "cache_service": False,
-                "end_to_end_test": False
+                "soroban_rpc": False,
+                "contracts_configured": False,
+                "contract_read": False,
+                "cache_service": False
             }
+    
+    async def _soroban_health(self) -> bool:
+        """
+        Ping the Soroban RPC with a getHealth request
+        
+        Returns:
+            True if the RPC reports itself healthy, False otherwise
+        """
+        response = await self._http.post(
+            self.soroban_rpc_url,
+            content=orjson.dumps({"jsonrpc": "2.0", "id": 1, "method": "getHealth"}),
+            headers={"Content-Type": "application/json"}
+        )
+        if response.status_code != 200:
+            return False
+        return orjson.loads(response.content).get("result", {}).get("status") == "healthy"
+    
+    async def _sentinel_price_read(self) -> bool:
+        """
+        Simulate a lastprice call for XLM on the external_cex contract
+        
+        Unlike _call_contract_price, this doesn't touch the circuit breaker
+        or fall back to other sources, so it only reports on the contract.
+        
+        Returns:
+            True if the contract returned a price, False otherwise
+        """
+        payload = self._build_price_payload(1, self.contracts["external_cex"], "XLM")
+        response = await self._http.post(
+            self.soroban_rpc_url,
+            content=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"}
+        )
+        if response.status_code != 200:
+            return False
+        return self._parse_price_response(_SIMULATE_DECODER.decode(response.content)) is not None
 
-# Global instance
-stellar_oracle_client = StellarOracleClient()
+@functools.lru_cache(maxsize=1)
+def get_stellar_oracle_client() -> StellarOracleClient:
+    """Return the shared oracle client, creating it on first use"""
+    return StellarOracleClient()
@@ -1,7 +1,3 @@
 """
 Utilities module for DeFi Risk Guardian
 """
-
-from .demo_utils import is_demo_mode, get_demo_wallet, should_use_mock_data, log_demo_action, demo_data_provider
-
-__all__ = ["is_demo_mode", "get_demo_wallet", "should_use_mock_data", "log_demo_action", "demo_data_provider"]
@@ -1,58 +1,133 @@
 """
 Global test configuration and fixtures
 """
+import orjson
 import pytest
-import asyncio
+from contextlib import contextmanager
 from unittest.mock import Mock, AsyncMock, patch
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
-from httpx import AsyncClient
+from httpx import AsyncClient, ASGITransport
+from pytest_asyncio import is_async_test
 
 from app.main import app
 from app.core.database import get_db, Base
 from app.core.config import settings
+from app.models.database import User
+from app.services.stellar_oracle import StellarOracleClient, get_stellar_oracle_client
+from tests.fixtures.mock_data import MOCK_WALLET_ADDRESSES
+
+# Sample payloads shared by every test through the session-scoped sample_*
+# fixtures; copy before mutating
+SAMPLE_WALLET_ADDRESS = "GDVKVA22NDD3M5TBUHX7LPOQLPDRH6GVB63WXLRGDVWJDIERA5EYT25O"
+SAMPLE_USER_DATA = {
+    "wallet_address": SAMPLE_WALLET_ADDRESS,
+    "risk_tolerance": 0.5
+}
+SAMPLE_PORTFOLIO_DATA = {
+    "asset_code": "XLM",
+    "asset_issuer": "native",
+    "balance": 1000.0,
+    "target_allocation": 0.3
+}
+SAMPLE_ALERT_DATA = {
+    "alert_type": "high_volatility",
+    "severity": "warning",
+    "message": "High volatility detected in portfolio",
+    "threshold": 0.15
+}
+
+# Request bodies for the payloads tests POST most often, encoded once
+JSON_HEADERS = {"content-type": "application/json"}
+SAMPLE_USER_JSON = orjson.dumps(SAMPLE_USER_DATA)
+SAMPLE_PORTFOLIO_JSON = orjson.dumps(SAMPLE_PORTFOLIO_DATA)
+
+# Marks a dependency that had no override before override_dependency ran
+_MISSING = object()
 
 # Test database URL (in-memory SQLite for speed)
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+SQLALCHEMY_DATABASE_URL = "sqlite://"
 
+# StaticPool keeps a single connection, so every session sees the same
+# in-memory database
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+# pysqlite manages transactions itself and breaks SAVEPOINTs; let SQLAlchemy
+# emit BEGIN so each test can run inside a rolled-back transaction
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+@event.listens_for(engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+def pytest_collection_modifyitems(items):
+    """Run every async test on the session event loop shared with fixtures."""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
 
 @pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def db_schema():
+    """Create the database schema once for the test session."""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
 
 @pytest.fixture(scope="function")
-def db_session():
-    """Create a fresh database session for each test."""
-    Base.metadata.create_all(bind=engine)
-    session = TestingSessionLocal()
+def db_session(db_schema):
+    """Create a database session whose changes are rolled back after each test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Commits inside the test only release a savepoint; the outer
+    # transaction is rolled back below
+    session = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
     try:
         yield session
     finally:
         session.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
+
+@pytest.fixture(scope="session")
+def app_client():
+    """Create a single test client (and run app startup once) for the session."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+@contextmanager
+def override_dependency(dependency, override):
+    """Override one FastAPI dependency, restoring only that entry afterwards."""
+    previous = app.dependency_overrides.get(dependency, _MISSING)
+    app.dependency_overrides[dependency] = override
+    try:
+        yield
+    finally:
+        if previous is _MISSING:
+            app.dependency_overrides.pop(dependency, None)
+        else:
+            app.dependency_overrides[dependency] = previous
 
 @pytest.fixture(scope="function")
-def client(db_session):
-    """Create a test client with database dependency override."""
+def client(app_client, db_session):
+    """Shared test client with this test's database session wired in."""
     def override_get_db():
         try:
             yield db_session
         finally:
             pass
     
-    app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as test_client:
-        yield test_client
-    app.dependency_overrides.clear()
+    with override_dependency(get_db, override_get_db):
+        yield app_client
 
 @pytest.fixture(scope="function")
 async def async_client(db_session):
@@ -63,56 +138,65 @@ async def async_client(db_session):
         finally:
             pass
     
-    app.dependency_overrides[get_db] = override_get_db
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        yield ac
-    app.dependency_overrides.clear()
+    with override_dependency(get_db, override_get_db):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            yield ac
+
+def _reset_oracle_mock(oracle):
+    """Put the shared oracle mock back to its default responses."""
+    oracle.reset_mock(return_value=True, side_effect=True)
+    oracle.get_asset_price = AsyncMock(return_value=0.12)
+    oracle.get_supported_assets = AsyncMock(return_value=[
+        {"code": "XLM", "issuer": None, "name": "Stellar Lumens"}
+    ])
+    oracle.get_price_history = AsyncMock(return_value=[
+        {"timestamp": "2024-01-01T00:00:00Z", "price": 0.12},
+        {"timestamp": "2024-01-02T00:00:00Z", "price": 0.13}
+    ])
+    oracle.health_check = AsyncMock(return_value={
+        "status": "healthy",
+        "horizon_connection": True,
+        "soroban_rpc": True,
+        "contracts_configured": True,
+        "contract_read": True,
+        "cache_service": True
+    })
+    
+    # Properties read by the health check
+    oracle.network = "testnet"
+    oracle.horizon_url = "https://horizon-testnet.stellar.org"
+    oracle.contracts = {
+        "stellar_dex": "CAVLP2FY3AJX4Q3FKF2FBJCM2P2N3FWYY6WRT53NQOTBS7J5UQ4SD6HLP",
+        "external_cex": "CCYOZX2H4Z3HUBXHAP5GLOAYQ73TGLMZB7O6FY7JFB7FUMW3ET5KMJRN6",
+        "fiat": "CCSSMW2RJTT4T5CB77P4GM2O7IQP5URZ5ICUEN5Y53D2QDDNAGU5NV4WFI"
+    }
+
+    # Horizon server used by wallet discovery and asset validation, so those
+    # answer offline: an empty wallet and every asset found
+    oracle.server = Mock()
+    oracle.server.accounts.return_value.account_id.return_value.call = AsyncMock(
+        return_value={"balances": []}
+    )
+    oracle.server.assets.return_value.for_code.return_value.for_issuer.return_value.call = AsyncMock(
+        return_value={"_embedded": {"records": []}}
+    )
+
+@pytest.fixture(scope="module")
+def stellar_oracle_mock():
+    """Oracle client mock built once per test module."""
+    # spec makes calls to methods the real client doesn't have fail loudly,
+    # and gives its async methods AsyncMock children
+    return Mock(spec=StellarOracleClient)
 
 @pytest.fixture
-def mock_stellar_oracle_client():
-    """Mock Stellar Oracle client for testing."""
-    with patch('app.api.v1.portfolio.endpoints.stellar_oracle_client') as mock_endpoints, \
-         patch('app.api.v1.portfolio.services.stellar_oracle_client') as mock_services, \
-         patch('app.api.v1.risk.stellar_oracle_client') as mock_risk:
-        # Configure mock methods
-        mock_endpoints.get_asset_price = AsyncMock(return_value=0.12)
-        mock_endpoints.get_supported_assets = AsyncMock(return_value=[
-            {"code": "XLM", "issuer": None, "name": "Stellar Lumens"}
-        ])
-        mock_endpoints.get_price_history = AsyncMock(return_value=[
-            {"timestamp": "2024-01-01T00:00:00Z", "price": 0.12},
-            {"timestamp": "2024-01-02T00:00:00Z", "price": 0.13}
-        ])
-        
-        mock_services.get_asset_price = AsyncMock(return_value=0.12)
-        mock_services.get_supported_assets = AsyncMock(return_value=[
-            {"code": "XLM", "issuer": None, "name": "Stellar Lumens"}
-        ])
-        mock_services.get_price_history = AsyncMock(return_value=[
-            {"timestamp": "2024-01-01T00:00:00Z", "price": 0.12},
-            {"timestamp": "2024-01-02T00:00:00Z", "price": 0.13}
-        ])
-        
-        mock_risk.get_asset_price = AsyncMock(return_value=0.12)
-        mock_risk.get_supported_assets = AsyncMock(return_value=[
-            {"code": "XLM", "issuer": None, "name": "Stellar Lumens"}
-        ])
-        mock_risk.get_price_history = AsyncMock(return_value=[
-            {"timestamp": "2024-01-01T00:00:00Z", "price": 0.12},
-            {"timestamp": "2024-01-02T00:00:00Z", "price": 0.13}
-        ])
-        
-        # Mock properties for health check
-        for mock_instance in [mock_endpoints, mock_services, mock_risk]:
-            mock_instance.network = "testnet"
-            mock_instance.horizon_url = "https://horizon-testnet.stellar.org"
-            mock_instance.contracts = {
-                "stellar_dex": "CAVLP2FY3AJX4Q3FKF2FBJCM2P2N3FWYY6WRT53NQOTBS7J5UQ4SD6HLP",
-                "external_cex": "CCYOZX2H4Z3HUBXHAP5GLOAYQ73TGLMZB7O6FY7JFB7FUMW3ET5KMJRN6",
-                "fiat": "CCSSMW2RJTT4T5CB77P4GM2O7IQP5URZ5ICUEN5Y53D2QDDNAGU5NV4WFI"
-            }
-        
-        yield mock_endpoints
+def mock_stellar_oracle_client(stellar_oracle_mock):
+    """Mock Stellar Oracle client for testing, reset to its defaults for each test."""
+    _reset_oracle_mock(stellar_oracle_mock)
+    # Route handlers get the client through Depends; the AI analyzer is a
+    # module-level singleton outside any request, so it is patched instead
+    with override_dependency(get_stellar_oracle_client, lambda: stellar_oracle_mock), \
+         patch('app.services.ai_portfolio_analyzer.get_stellar_oracle_client', return_value=stellar_oracle_mock):
+        yield stellar_oracle_mock
 
 @pytest.fixture
 def mock_cache_service():
@@ -130,35 +214,50 @@ def mock_cache_service():
         }
         yield mock
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_wallet_address():
     """Sample wallet address for testing."""
-    return "GDVKVA22NDD3M5TBUHX7LPOQLPDRH6GVB63WXLRGDVWJDIERA5EYT25O"
+    return SAMPLE_WALLET_ADDRESS
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def sample_demo_wallet():
+    """Demo (GDEMO...) wallet address, accepted without network validation."""
+    return MOCK_WALLET_ADDRESSES[0]
+
+@pytest.fixture(scope="session")
 def sample_user_data():
     """Sample user data for testing."""
-    return {
-        "wallet_address": "GDVKVA22NDD3M5TBUHX7LPOQLPDRH6GVB63WXLRGDVWJDIERA5EYT25O",
-        "risk_tolerance": 0.5
-    }
+    return SAMPLE_USER_DATA
 
 @pytest.fixture
+def created_user(db_session, sample_user_data):
+    """User for sample_user_data, inserted directly and rolled back with the test."""
+    user = User(**sample_user_data)
+    db_session.add(user)
+    db_session.commit()
+    return str(user.id)
+
+@pytest.fixture(scope="session")
 def sample_portfolio_data():
     """Sample portfolio data for testing."""
-    return {
-        "asset_code": "XLM",
-        "asset_issuer": "native",
-        "balance": 1000.0,
-        "target_allocation": 0.3
-    }
+    return SAMPLE_PORTFOLIO_DATA
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def json_headers():
+    """Headers for posting pre-encoded JSON bodies."""
+    return JSON_HEADERS
+
+@pytest.fixture(scope="session")
+def sample_user_json():
+    """Sample user data, already JSON-encoded."""
+    return SAMPLE_USER_JSON
+
+@pytest.fixture(scope="session")
+def sample_portfolio_json():
+    """Sample portfolio data, already JSON-encoded."""
+    return SAMPLE_PORTFOLIO_JSON
+
+@pytest.fixture(scope="session")
 def sample_alert_data():
     """Sample alert data for testing."""
-    return {
-        "alert_type": "high_volatility",
-        "severity": "warning",
-        "message": "High volatility detected in portfolio",
-        "threshold": 0.15
-    }
+    return SAMPLE_ALERT_DATA
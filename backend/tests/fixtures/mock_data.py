@@ -3,15 +3,17 @@ Mock data fixtures for testing
 """
 from typing import Dict, List, Any
 
+# Top-level collections are tuples so tests can't mutate the shared data
+
 # Sample wallet addresses
-MOCK_WALLET_ADDRESSES = [
+MOCK_WALLET_ADDRESSES = (
     "GDEMO123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ",
     "GDEMO987654321ZYXWVUTSRQPONMLKJIHGFEDCBA",
     "GDEMO555666777888999000111222333444555666"
-]
+)
 
 # Sample user data
-MOCK_USERS = [
+MOCK_USERS = (
     {
         "wallet_address": "GDEMO123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ",
         "risk_tolerance": 0.5,
@@ -27,10 +29,10 @@ MOCK_USERS = [
         "risk_tolerance": 0.3,
         "created_at": "2024-01-03T00:00:00Z"
     }
-]
+)
 
 # Sample portfolio assets
-MOCK_PORTFOLIO_ASSETS = [
+MOCK_PORTFOLIO_ASSETS = (
     {
         "asset_code": "XLM",
         "asset_issuer": "native",
@@ -52,10 +54,10 @@ MOCK_PORTFOLIO_ASSETS = [
         "price": 45000.0,
         "value": 4500.0
     }
-]
+)
 
 # Sample risk alerts
-MOCK_ALERTS = [
+MOCK_ALERTS = (
     {
         "alert_type": "high_volatility",
         "severity": "warning",
@@ -80,7 +82,7 @@ MOCK_ALERTS = [
         "current_value": 0.02,
         "is_active": False
     }
-]
+)
 
 # Sample risk metrics
 MOCK_RISK_METRICS = {
@@ -97,13 +99,13 @@ MOCK_RISK_METRICS = {
 }
 
 # Sample price history
-MOCK_PRICE_HISTORY = [
+MOCK_PRICE_HISTORY = (
     {"timestamp": "2024-01-01T00:00:00Z", "price": 0.11, "volume": 1000000},
     {"timestamp": "2024-01-01T01:00:00Z", "price": 0.115, "volume": 1200000},
     {"timestamp": "2024-01-01T02:00:00Z", "price": 0.12, "volume": 1100000},
     {"timestamp": "2024-01-01T03:00:00Z", "price": 0.118, "volume": 900000},
     {"timestamp": "2024-01-01T04:00:00Z", "price": 0.122, "volume": 1300000}
-]
+)
 
 # Sample rebalance suggestions
 MOCK_REBALANCE_SUGGESTIONS = {
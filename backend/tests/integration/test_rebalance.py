@@ -4,7 +4,7 @@ Integration tests for Rebalance API endpoints
 
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, Mock, AsyncMock
+from unittest.mock import AsyncMock
 from app.main import app
 
 client = TestClient(app)
@@ -13,53 +13,51 @@ client = TestClient(app)
 class TestRebalance:
     """Test cases for Rebalance endpoints"""
     
-    def test_suggest_rebalancing_success(self, client, sample_user_data, sample_portfolio_data):
+    def test_suggest_rebalancing_success(self, client, mock_stellar_oracle_client, sample_user_data, sample_user_json, sample_portfolio_json, json_headers):
         """Test successful rebalancing suggestion"""
         # Create user first
-        user_response = client.post("/api/v1/portfolio/users", json=sample_user_data)
+        user_response = client.post("/api/v1/portfolio/users", content=sample_user_json, headers=json_headers)
         user_data = user_response.json()
         user_id = user_data["user_id"]
         assert isinstance(user_id, str)
         
         # Add asset to portfolio
-        asset_data = sample_portfolio_data
-        client.post(f"/api/v1/portfolio/{sample_user_data['wallet_address']}/assets", json=asset_data)
+        client.post(f"/api/v1/portfolio/{sample_user_data['wallet_address']}/assets", content=sample_portfolio_json, headers=json_headers)
         
         # Mock Reflector client for price data
-        with patch('app.api.v1.rebalance.stellar_oracle_client') as mock_oracle:
-            mock_oracle.get_asset_price = AsyncMock(return_value=0.12)
-            
-            # Request rebalancing suggestion
-            rebalance_request = {
-                "wallet_address": sample_user_data["wallet_address"],
-                "threshold": 0.05,
-                "max_slippage": 0.01
-            }
-            
-            response = client.post("/api/v1/rebalance/suggest", json=rebalance_request)
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            # Check response structure
-            assert "should_rebalance" in data
-            assert "current_allocation" in data
-            assert "target_allocation" in data
-            assert "suggested_orders" in data
-            assert "estimated_cost" in data
-            assert "risk_improvement" in data
-            
-            # Check data types
-            assert isinstance(data["should_rebalance"], bool)
-            assert isinstance(data["current_allocation"], dict)
-            assert isinstance(data["target_allocation"], dict)
-            assert isinstance(data["suggested_orders"], list)
-            assert isinstance(data["estimated_cost"], (int, float))
-            assert isinstance(data["risk_improvement"], (int, float))
-            
-            # Check reasonable ranges
-            assert 0 <= data["estimated_cost"]
-            assert 0 <= data["risk_improvement"] <= 100
+        mock_stellar_oracle_client.get_asset_price = AsyncMock(return_value=0.12)
+        
+        # Request rebalancing suggestion
+        rebalance_request = {
+            "wallet_address": sample_user_data["wallet_address"],
+            "threshold": 0.05,
+            "max_slippage": 0.01
+        }
+        
+        response = client.post("/api/v1/rebalance/suggest", json=rebalance_request)
+        
+        assert response.status_code == 200
+        data = response.json()
+        
+        # Check response structure
+        assert "should_rebalance" in data
+        assert "current_allocation" in data
+        assert "target_allocation" in data
+        assert "suggested_orders" in data
+        assert "estimated_cost" in data
+        assert "risk_improvement" in data
+        
+        # Check data types
+        assert isinstance(data["should_rebalance"], bool)
+        assert isinstance(data["current_allocation"], dict)
+        assert isinstance(data["target_allocation"], dict)
+        assert isinstance(data["suggested_orders"], list)
+        assert isinstance(data["estimated_cost"], (int, float))
+        assert isinstance(data["risk_improvement"], (int, float))
+        
+        # Check reasonable ranges
+        assert 0 <= data["estimated_cost"]
+        assert 0 <= data["risk_improvement"] <= 100
     
     def test_suggest_rebalancing_user_not_found(self, client, sample_wallet_address):
         """Test rebalancing suggestion for non-existent user"""
@@ -77,11 +75,11 @@ class TestRebalance:
         assert "error" in data
         assert "User not found" in data["error"]
     
-    def test_suggest_rebalancing_no_portfolio(self, client, sample_user_data):
+    def test_suggest_rebalancing_no_portfolio(self, client, sample_user_data, sample_user_json, json_headers):
         """Test rebalancing suggestion for user with no portfolio"""
         # Create user but don't add any assets manually
         # Note: The system will automatically discover assets from the Stellar wallet
-        client.post("/api/v1/portfolio/users", json=sample_user_data)
+        client.post("/api/v1/portfolio/users", content=sample_user_json, headers=json_headers)
         
         rebalance_request = {
             "wallet_address": sample_user_data["wallet_address"],
@@ -103,35 +101,33 @@ class TestRebalance:
         assert "estimated_cost" in data
         assert "risk_improvement" in data
     
-    def test_suggest_rebalancing_reflector_error(self, client, sample_user_data, sample_portfolio_data):
+    def test_suggest_rebalancing_reflector_error(self, client, mock_stellar_oracle_client, sample_user_data, sample_user_json, sample_portfolio_json, json_headers):
         """Test rebalancing suggestion when Reflector API fails"""
         # Create user and portfolio
-        user_response = client.post("/api/v1/portfolio/users", json=sample_user_data)
-        asset_data = sample_portfolio_data
-        client.post(f"/api/v1/portfolio/{sample_user_data['wallet_address']}/assets", json=asset_data)
+        user_response = client.post("/api/v1/portfolio/users", content=sample_user_json, headers=json_headers)
+        client.post(f"/api/v1/portfolio/{sample_user_data['wallet_address']}/assets", content=sample_portfolio_json, headers=json_headers)
         
         # Mock Reflector client to raise exception
-        with patch('app.api.v1.rebalance.stellar_oracle_client') as mock_oracle:
-            mock_oracle.get_asset_price = AsyncMock(side_effect=Exception("Reflector API error"))
-            
-            rebalance_request = {
-                "wallet_address": sample_user_data["wallet_address"],
-                "threshold": 0.05,
-                "max_slippage": 0.01
-            }
-            
-            response = client.post("/api/v1/rebalance/suggest", json=rebalance_request)
-            
-            assert response.status_code == 500
-            data = response.json()
-            
-            assert "error" in data
-            assert "Error suggesting rebalancing" in data["error"]
+        mock_stellar_oracle_client.get_asset_price = AsyncMock(side_effect=Exception("Reflector API error"))
+        
+        rebalance_request = {
+            "wallet_address": sample_user_data["wallet_address"],
+            "threshold": 0.05,
+            "max_slippage": 0.01
+        }
+        
+        response = client.post("/api/v1/rebalance/suggest", json=rebalance_request)
+        
+        assert response.status_code == 500
+        data = response.json()
+        
+        assert "error" in data
+        assert "Error suggesting rebalancing" in data["error"]
     
-    def test_execute_rebalancing_success(self, client, sample_user_data):
+    def test_execute_rebalancing_success(self, client, sample_user_data, sample_user_json, json_headers):
         """Test successful rebalancing execution"""
         # Create user first
-        client.post("/api/v1/portfolio/users", json=sample_user_data)
+        client.post("/api/v1/portfolio/users", content=sample_user_json, headers=json_headers)
         
         # Execute rebalancing
         execute_request = {
@@ -192,10 +188,10 @@ class TestRebalance:
         assert "error" in data
         assert "User not found" in data["error"]
     
-    def test_get_rebalance_history_success(self, client, sample_user_data):
+    def test_get_rebalance_history_success(self, client, sample_user_data, sample_user_json, json_headers):
         """Test successful rebalance history retrieval"""
         # Create user first
-        client.post("/api/v1/portfolio/users", json=sample_user_data)
+        client.post("/api/v1/portfolio/users", content=sample_user_json, headers=json_headers)
         
         # Execute a rebalancing to create history
         execute_request = {
@@ -251,25 +247,23 @@ class TestRebalance:
         assert "error" in data
         assert "User not found" in data["error"]
     
-    def test_suggest_rebalancing_invalid_threshold(self, client, sample_user_data, sample_portfolio_data):
+    def test_suggest_rebalancing_invalid_threshold(self, client, mock_stellar_oracle_client, sample_user_data, sample_user_json, sample_portfolio_json, json_headers):
         """Test rebalancing suggestion with invalid threshold"""
         # Create user and portfolio
-        user_response = client.post("/api/v1/portfolio/users", json=sample_user_data)
-        asset_data = sample_portfolio_data
-        client.post(f"/api/v1/portfolio/{sample_user_data['wallet_address']}/assets", json=asset_data)
+        user_response = client.post("/api/v1/portfolio/users", content=sample_user_json, headers=json_headers)
+        client.post(f"/api/v1/portfolio/{sample_user_data['wallet_address']}/assets", content=sample_portfolio_json, headers=json_headers)
         
         # Mock Reflector client
-        with patch('app.api.v1.rebalance.stellar_oracle_client') as mock_oracle:
-            mock_oracle.get_asset_price = AsyncMock(return_value=0.12)
-            
-            # Test with invalid threshold (negative)
-            rebalance_request = {
-                "wallet_address": sample_user_data["wallet_address"],
-                "threshold": -0.05,  # Invalid: negative threshold
-                "max_slippage": 0.01
-            }
-            
-            response = client.post("/api/v1/rebalance/suggest", json=rebalance_request)
-            
-            # Should still work as threshold validation is not implemented
-            assert response.status_code == 200
+        mock_stellar_oracle_client.get_asset_price = AsyncMock(return_value=0.12)
+        
+        # Test with invalid threshold (negative)
+        rebalance_request = {
+            "wallet_address": sample_user_data["wallet_address"],
+            "threshold": -0.05,  # Invalid: negative threshold
+            "max_slippage": 0.01
+        }
+        
+        response = client.post("/api/v1/rebalance/suggest", json=rebalance_request)
+        
+        # Should still work as threshold validation is not implemented
+        assert response.status_code == 200
@@ -4,7 +4,7 @@ Integration tests for Risk Analysis API endpoints
 
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, Mock
+from unittest.mock import AsyncMock
 from app.main import app
 
 client = TestClient(app)
@@ -13,61 +13,58 @@ client = TestClient(app)
 class TestRiskAnalysis:
     """Test cases for Risk Analysis endpoints"""
     
-    def test_analyze_portfolio_risk_success(self, client, sample_user_data, sample_portfolio_data):
+    def test_analyze_portfolio_risk_success(self, client, mock_stellar_oracle_client, sample_user_data, sample_user_json, sample_portfolio_json, json_headers):
         """Test successful portfolio risk analysis"""
         # Create user first
-        user_response = client.post("/api/v1/portfolio/users", json=sample_user_data)
+        user_response = client.post("/api/v1/portfolio/users", content=sample_user_json, headers=json_headers)
         user_data = user_response.json()
         user_id = user_data["user_id"]
         assert isinstance(user_id, str)
         
         # Add asset to portfolio
-        asset_data = sample_portfolio_data
-        client.post(f"/api/v1/portfolio/{sample_user_data['wallet_address']}/assets", json=asset_data)
+        client.post(f"/api/v1/portfolio/{sample_user_data['wallet_address']}/assets", content=sample_portfolio_json, headers=json_headers)
         
         # Mock Reflector client for price data
-        with patch('app.api.v1.risk.stellar_oracle_client') as mock_reflector:
-            from unittest.mock import AsyncMock
-            mock_reflector.get_asset_price = AsyncMock(return_value=0.12)
-            
-            # Perform risk analysis
-            risk_request = {
-                "wallet_address": sample_user_data["wallet_address"],
-                "confidence_level": 0.95
-            }
-            
-            response = client.post("/api/v1/risk/analyze", json=risk_request)
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            # Check response structure
-            assert "portfolio_value" in data
-            assert "var_95" in data
-            assert "var_99" in data
-            assert "volatility" in data
-            assert "sharpe_ratio" in data
-            assert "beta" in data
-            assert "max_drawdown" in data
-            assert "risk_score" in data
-            assert "recommendations" in data
-            
-            # Check data types and ranges
-            assert isinstance(data["portfolio_value"], (int, float))
-            assert isinstance(data["var_95"], (int, float))
-            assert isinstance(data["var_99"], (int, float))
-            assert isinstance(data["volatility"], (int, float))
-            assert isinstance(data["sharpe_ratio"], (int, float))
-            assert isinstance(data["beta"], (int, float))
-            assert isinstance(data["max_drawdown"], (int, float))
-            assert isinstance(data["risk_score"], (int, float))
-            assert isinstance(data["recommendations"], list)
-            
-            # Check reasonable ranges
-            assert data["portfolio_value"] > 0
-            assert 0 <= data["volatility"] <= 1
-            assert 0 <= data["max_drawdown"] <= 1
-            assert 0 <= data["risk_score"] <= 100
+        mock_stellar_oracle_client.get_asset_price = AsyncMock(return_value=0.12)
+        
+        # Perform risk analysis
+        risk_request = {
+            "wallet_address": sample_user_data["wallet_address"],
+            "confidence_level": 0.95
+        }
+        
+        response = client.post("/api/v1/risk/analyze", json=risk_request)
+        
+        assert response.status_code == 200
+        data = response.json()
+        
+        # Check response structure
+        assert "portfolio_value" in data
+        assert "var_95" in data
+        assert "var_99" in data
+        assert "volatility" in data
+        assert "sharpe_ratio" in data
+        assert "beta" in data
+        assert "max_drawdown" in data
+        assert "risk_score" in data
+        assert "recommendations" in data
+        
+        # Check data types and ranges
+        assert isinstance(data["portfolio_value"], (int, float))
+        assert isinstance(data["var_95"], (int, float))
+        assert isinstance(data["var_99"], (int, float))
+        assert isinstance(data["volatility"], (int, float))
+        assert isinstance(data["sharpe_ratio"], (int, float))
+        assert isinstance(data["beta"], (int, float))
+        assert isinstance(data["max_drawdown"], (int, float))
+        assert isinstance(data["risk_score"], (int, float))
+        assert isinstance(data["recommendations"], list)
+        
+        # Check reasonable ranges
+        assert data["portfolio_value"] > 0
+        assert 0 <= data["volatility"] <= 1
+        assert 0 <= data["max_drawdown"] <= 1
+        assert 0 <= data["risk_score"] <= 100
     
     def test_analyze_portfolio_risk_user_not_found(self, client, sample_wallet_address):
         """Test risk analysis for non-existent user"""
@@ -84,11 +81,11 @@ class TestRiskAnalysis:
         assert "error" in data
         assert "User not found" in data["error"]
     
-    def test_analyze_portfolio_risk_no_portfolio(self, client, sample_user_data, mock_stellar_oracle_client):
+    def test_analyze_portfolio_risk_no_portfolio(self, client, sample_user_data, mock_stellar_oracle_client, sample_user_json, json_headers):
         """Test risk analysis for user with no portfolio"""
         # Create user but don't add any assets manually
         # Note: The system will automatically discover assets from the Stellar wallet
-        client.post("/api/v1/portfolio/users", json=sample_user_data)
+        client.post("/api/v1/portfolio/users", content=sample_user_json, headers=json_headers)
         
         risk_request = {
             "wallet_address": sample_user_data["wallet_address"],
@@ -107,12 +104,11 @@ class TestRiskAnalysis:
         assert "portfolio_value" in data
         assert "recommendations" in data
     
-    def test_analyze_portfolio_risk_invalid_confidence_level(self, client, sample_user_data, sample_portfolio_data):
+    def test_analyze_portfolio_risk_invalid_confidence_level(self, client, sample_user_data, sample_user_json, sample_portfolio_json, json_headers):
         """Test risk analysis with invalid confidence level"""
         # Create user and portfolio
-        user_response = client.post("/api/v1/portfolio/users", json=sample_user_data)
-        asset_data = sample_portfolio_data
-        client.post(f"/api/v1/portfolio/{sample_user_data['wallet_address']}/assets", json=asset_data)
+        user_response = client.post("/api/v1/portfolio/users", content=sample_user_json, headers=json_headers)
+        client.post(f"/api/v1/portfolio/{sample_user_data['wallet_address']}/assets", content=sample_portfolio_json, headers=json_headers)
         
         # Test with invalid confidence level
         risk_request = {
@@ -125,50 +121,47 @@ class TestRiskAnalysis:
         # Should return 422 for validation error (invalid confidence level)
         assert response.status_code == 422
     
-    def test_get_risk_metrics_success(self, client, sample_user_data, sample_portfolio_data):
+    def test_get_risk_metrics_success(self, client, mock_stellar_oracle_client, sample_user_data, sample_user_json, sample_portfolio_json, json_headers):
         """Test successful risk metrics retrieval"""
         # Create user and portfolio
-        user_response = client.post("/api/v1/portfolio/users", json=sample_user_data)
-        asset_data = sample_portfolio_data
-        client.post(f"/api/v1/portfolio/{sample_user_data['wallet_address']}/assets", json=asset_data)
+        user_response = client.post("/api/v1/portfolio/users", content=sample_user_json, headers=json_headers)
+        client.post(f"/api/v1/portfolio/{sample_user_data['wallet_address']}/assets", content=sample_portfolio_json, headers=json_headers)
         
         # Mock Reflector client
-        with patch('app.api.v1.risk.stellar_oracle_client') as mock_reflector:
-            from unittest.mock import AsyncMock
-            mock_reflector.get_asset_price = AsyncMock(return_value=0.12)
-            
-            # First perform risk analysis to create metrics
-            risk_request = {
-                "wallet_address": sample_user_data["wallet_address"],
-                "confidence_level": 0.95
-            }
-            client.post("/api/v1/risk/analyze", json=risk_request)
-            
-            # Now get the metrics
-            response = client.get(f"/api/v1/risk/{sample_user_data['wallet_address']}/metrics")
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            # Check response structure
-            assert "portfolio_value" in data
-            assert "var_95" in data
-            assert "var_99" in data
-            assert "volatility" in data
-            assert "sharpe_ratio" in data
-            assert "beta" in data
-            assert "max_drawdown" in data
-            assert "calculated_at" in data
-            
-            # Check data types
-            assert isinstance(data["portfolio_value"], (int, float))
-            assert isinstance(data["var_95"], (int, float))
-            assert isinstance(data["var_99"], (int, float))
-            assert isinstance(data["volatility"], (int, float))
-            assert isinstance(data["sharpe_ratio"], (int, float))
-            assert isinstance(data["beta"], (int, float))
-            assert isinstance(data["max_drawdown"], (int, float))
-            assert isinstance(data["calculated_at"], str)
+        mock_stellar_oracle_client.get_asset_price = AsyncMock(return_value=0.12)
+        
+        # First perform risk analysis to create metrics
+        risk_request = {
+            "wallet_address": sample_user_data["wallet_address"],
+            "confidence_level": 0.95
+        }
+        client.post("/api/v1/risk/analyze", json=risk_request)
+        
+        # Now get the metrics
+        response = client.get(f"/api/v1/risk/{sample_user_data['wallet_address']}/metrics")
+        
+        assert response.status_code == 200
+        data = response.json()
+        
+        # Check response structure
+        assert "portfolio_value" in data
+        assert "var_95" in data
+        assert "var_99" in data
+        assert "volatility" in data
+        assert "sharpe_ratio" in data
+        assert "beta" in data
+        assert "max_drawdown" in data
+        assert "calculated_at" in data
+        
+        # Check data types
+        assert isinstance(data["portfolio_value"], (int, float))
+        assert isinstance(data["var_95"], (int, float))
+        assert isinstance(data["var_99"], (int, float))
+        assert isinstance(data["volatility"], (int, float))
+        assert isinstance(data["sharpe_ratio"], (int, float))
+        assert isinstance(data["beta"], (int, float))
+        assert isinstance(data["max_drawdown"], (int, float))
+        assert isinstance(data["calculated_at"], str)
     
     def test_get_risk_metrics_user_not_found(self, client, sample_wallet_address):
         """Test risk metrics retrieval for non-existent user"""
@@ -180,10 +173,10 @@ class TestRiskAnalysis:
         assert "error" in data
         assert "User not found" in data["error"]
     
-    def test_get_risk_metrics_no_metrics(self, client, sample_user_data):
+    def test_get_risk_metrics_no_metrics(self, client, sample_user_data, sample_user_json, json_headers):
         """Test risk metrics retrieval when no metrics exist"""
         # Create user but don't perform risk analysis
-        client.post("/api/v1/portfolio/users", json=sample_user_data)
+        client.post("/api/v1/portfolio/users", content=sample_user_json, headers=json_headers)
         
         response = client.get(f"/api/v1/risk/{sample_user_data['wallet_address']}/metrics")
         
@@ -193,27 +186,24 @@ class TestRiskAnalysis:
         assert "error" in data
         assert "No risk metrics found" in data["error"]
     
-    def test_analyze_portfolio_risk_reflector_error(self, client, sample_user_data, sample_portfolio_data):
+    def test_analyze_portfolio_risk_reflector_error(self, client, mock_stellar_oracle_client, sample_user_data, sample_user_json, sample_portfolio_json, json_headers):
         """Test risk analysis when Reflector API fails"""
         # Create user and portfolio
-        user_response = client.post("/api/v1/portfolio/users", json=sample_user_data)
-        asset_data = sample_portfolio_data
-        client.post(f"/api/v1/portfolio/{sample_user_data['wallet_address']}/assets", json=asset_data)
+        user_response = client.post("/api/v1/portfolio/users", content=sample_user_json, headers=json_headers)
+        client.post(f"/api/v1/portfolio/{sample_user_data['wallet_address']}/assets", content=sample_portfolio_json, headers=json_headers)
         
         # Mock Reflector client to raise exception
-        with patch('app.api.v1.risk.stellar_oracle_client') as mock_reflector:
-            from unittest.mock import AsyncMock
-            mock_reflector.get_asset_price = AsyncMock(side_effect=Exception("Reflector API error"))
-            
-            risk_request = {
-                "wallet_address": sample_user_data["wallet_address"],
-                "confidence_level": 0.95
-            }
-            
-            response = client.post("/api/v1/risk/analyze", json=risk_request)
-            
-            assert response.status_code == 500
-            data = response.json()
-            
-            assert "error" in data
-            assert "Error analyzing risk" in data["error"]
+        mock_stellar_oracle_client.get_asset_price = AsyncMock(side_effect=Exception("Reflector API error"))
+        
+        risk_request = {
+            "wallet_address": sample_user_data["wallet_address"],
+            "confidence_level": 0.95
+        }
+        
+        response = client.post("/api/v1/risk/analyze", json=risk_request)
+        
+        assert response.status_code == 500
+        data = response.json()
+        
+        assert "error" in data
+        assert "Error analyzing risk" in data["error"]
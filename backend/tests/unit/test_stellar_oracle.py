@@ -1,10 +1,15 @@
 """
 Unit tests for Stellar Oracle Client
 """
+import asyncio
+import time
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
-from datetime import datetime, timedelta
-from app.services.stellar_oracle import StellarOracleClient
+from datetime import datetime, timedelta, timezone
+from typing import List
+import msgspec
+from app.core.config import settings
+from app.services.stellar_oracle import StellarOracleClient, SimulateResponse
 
 
 @pytest.mark.unit
@@ -23,12 +28,32 @@ class TestStellarOracleClient:
     async def test_get_asset_price_cache_hit(self):
         """Test price retrieval with cache hit"""
         with patch('app.services.stellar_oracle.cache_service') as mock_cache:
-            mock_cache.get.return_value = 0.12
+            mock_cache.get.return_value = {"price": 0.12, "ts": time.time()}
             
-            price = await self.client.get_asset_price('XLM')
+            with patch.object(self.client, '_call_contract_price') as mock_call:
+                price = await self.client.get_asset_price('XLM')
             
             assert price == 0.12
-            mock_cache.get.assert_called_once_with('price:XLM')
+            mock_cache.get.assert_called_once_with('oracle:price:XLM')
+            mock_call.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_asset_price_stale_cache_refreshes_in_background(self):
+        """Test that a stale cached price is served while it is refreshed"""
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache:
+            stale = {"price": 0.12, "ts": time.time() - self.client.price_fresh_ttl - 1}
+            mock_cache.get.side_effect = lambda key: stale if key.startswith('oracle:price:') else None
+            
+            with patch.object(self.client, '_call_contract_price', return_value=0.15):
+                price = await self.client.get_asset_price('XLM')
+                assert price == 0.12
+                
+                await asyncio.gather(*self.client._background_tasks)
+            
+            mock_cache.set.assert_any_call(
+                'oracle:price:XLM', {"price": 0.15, "ts": pytest.approx(time.time(), abs=5)}, ttl_seconds=self.client.price_stale_ttl
+            )
+            assert self.client._get_local_price('XLM') == 0.15
 
     @pytest.mark.asyncio
     async def test_get_asset_price_contract_success(self):
@@ -41,7 +66,8 @@ class TestStellarOracleClient:
                 price = await self.client.get_asset_price('XLM')
                 
                 assert price == 0.15
-                mock_cache.set.assert_called_once()
+                mock_cache.set.assert_any_call('oracle:source:XLM', 'stellar_dex', ttl_seconds=self.client.SOURCE_HINT_TTL)
+                assert mock_cache.set.call_args_list[0].args[0] == 'oracle:price:XLM'
 
     @pytest.mark.asyncio
     async def test_get_asset_price_dex_fallback(self):
@@ -68,6 +94,29 @@ class TestStellarOracleClient:
                     
                     assert price is None
 
+    @pytest.mark.asyncio
+    async def test_get_asset_price_negative_cache(self):
+        """Test that misses are cached and short-circuit later lookups"""
+        issuer = "GA5ZSEJYB37JRC5AVCIA5MOP4RHTM335X2KGX3IHOJAPP5RE34K4KZVN"
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache:
+            mock_cache.get.return_value = None
+            
+            with patch.object(self.client, '_call_contract_price', return_value=None), \
+                 patch.object(self.client, '_get_price_from_dex_trades', return_value=None):
+                price = await self.client.get_asset_price('UNKNOWN', issuer)
+            
+            assert price is None
+            mock_cache.set.assert_called_once_with(
+                f'oracle:price:UNKNOWN:{issuer}', self.client.PRICE_MISS, ttl_seconds=self.client.PRICE_MISS_TTL
+            )
+            
+            mock_cache.get.return_value = self.client.PRICE_MISS
+            with patch.object(self.client, '_call_contract_price') as mock_call:
+                price = await self.client.get_asset_price('UNKNOWN', issuer)
+            
+            assert price is None
+            mock_call.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_get_price_from_dex_trades_success(self):
         """Test DEX price calculation from trades"""
@@ -83,7 +132,7 @@ class TestStellarOracleClient:
         mock_trades = Mock()
         mock_trades.records = [mock_trade1, mock_trade2]
         
-        self.mock_server.trades.return_value.for_asset_pair.return_value.order.return_value.limit.return_value.call.return_value = mock_trades
+        self.mock_server.trades.return_value.for_asset_pair.return_value.order.return_value.limit.return_value.call = AsyncMock(return_value=mock_trades)
         
         with patch.object(self.client, '_get_xlm_usd_price', return_value=1.0):
             price = await self.client._get_price_from_dex_trades('XLM')
@@ -97,7 +146,7 @@ class TestStellarOracleClient:
         mock_trades = Mock()
         mock_trades.records = []
         
-        self.mock_server.trades.return_value.for_asset_pair.return_value.order.return_value.limit.return_value.call.return_value = mock_trades
+        self.mock_server.trades.return_value.for_asset_pair.return_value.order.return_value.limit.return_value.call = AsyncMock(return_value=mock_trades)
         
         price = await self.client._get_price_from_dex_trades('XLM')
         
@@ -116,7 +165,7 @@ class TestStellarOracleClient:
             }
         }
         
-        self.mock_server.trades.return_value.for_asset_pair.return_value.order.return_value.limit.return_value.call.return_value = mock_trades
+        self.mock_server.trades.return_value.for_asset_pair.return_value.order.return_value.limit.return_value.call = AsyncMock(return_value=mock_trades)
         
         with patch.object(self.client, '_get_xlm_usd_price', return_value=1.0):
             price = await self.client._get_price_from_dex_trades('XLM')
@@ -140,18 +189,18 @@ class TestStellarOracleClient:
         ]
         
         with patch('app.services.stellar_oracle.cache_service') as mock_cache:
-            mock_cache.get.return_value = cached_assets
+            mock_cache.get_packed.return_value = cached_assets
             
             assets = await self.client.get_supported_assets()
             
             assert assets == cached_assets
-            mock_cache.get.assert_called_once_with('supported_assets')
+            mock_cache.get_packed.assert_called_once_with('oracle:assets:all')
 
     @pytest.mark.asyncio
     async def test_get_supported_assets_dex_fallback(self):
         """Test supported assets from DEX"""
         with patch('app.services.stellar_oracle.cache_service') as mock_cache:
-            mock_cache.get.return_value = None
+            mock_cache.get_packed.return_value = None
             
             with patch.object(self.client, '_get_assets_from_dex', return_value=[
                 {"code": "XLM", "issuer": None, "name": "Stellar Lumens"}
@@ -165,7 +214,7 @@ class TestStellarOracleClient:
     async def test_get_supported_assets_final_fallback(self):
         """Test supported assets final fallback"""
         with patch('app.services.stellar_oracle.cache_service') as mock_cache:
-            mock_cache.get.return_value = None
+            mock_cache.get_packed.return_value = None
             
             with patch.object(self.client, '_get_assets_from_dex', return_value=[]):
                 assets = await self.client.get_supported_assets()
@@ -175,6 +224,18 @@ class TestStellarOracleClient:
                 assert assets[1]["code"] == "USDC"
                 assert assets[2]["code"] == "BTC"
 
+    def test_normalize_trades(self):
+        """Test that object and dict Horizon responses normalize to trade dicts"""
+        trade = Mock()
+        trade.base_amount = "10"
+        object_response = Mock()
+        object_response.records = [trade]
+        dict_response = {"_embedded": {"records": [{"base_amount": "20"}]}}
+
+        assert self.client._normalize_trades(object_response)[0]["base_amount"] == "10"
+        assert self.client._normalize_trades(dict_response) == [{"base_amount": "20"}]
+        assert self.client._normalize_trades("unexpected") is None
+
     @pytest.mark.asyncio
     async def test_get_assets_from_dex_success(self):
         """Test asset discovery from DEX trades"""
@@ -194,7 +255,7 @@ class TestStellarOracleClient:
         mock_trades = Mock()
         mock_trades.records = [mock_trade1, mock_trade2]
         
-        self.mock_server.trades.return_value.order.return_value.limit.return_value.call.return_value = mock_trades
+        self.mock_server.trades.return_value.order.return_value.limit.return_value.call = AsyncMock(return_value=mock_trades)
         
         assets = await self.client._get_assets_from_dex()
         
@@ -220,7 +281,7 @@ class TestStellarOracleClient:
             }
         }
         
-        self.mock_server.trades.return_value.order.return_value.limit.return_value.call.return_value = mock_trades
+        self.mock_server.trades.return_value.order.return_value.limit.return_value.call = AsyncMock(return_value=mock_trades)
         
         assets = await self.client._get_assets_from_dex()
         
@@ -232,45 +293,107 @@ class TestStellarOracleClient:
     @pytest.mark.asyncio
     async def test_health_check_success(self):
         """Test health check when all components are healthy"""
-        self.mock_server.ledgers.return_value.order.return_value.limit.return_value.call.return_value = Mock()
+        self.mock_server.ledgers.return_value.order.return_value.limit.return_value.call = AsyncMock(return_value=Mock())
         
         with patch('app.services.stellar_oracle.cache_service') as mock_cache:
             mock_cache.is_connected.return_value = True
             
-            with patch.object(self.client, 'get_asset_price', return_value=0.12):
+            with patch.object(self.client, '_soroban_health', return_value=True), \
+                 patch.object(self.client, '_sentinel_price_read', return_value=True), \
+                 patch.object(self.client, 'get_asset_price') as mock_price:
                 health = await self.client.health_check()
                 
                 assert isinstance(health, dict)
                 assert health['status'] == 'healthy'
                 assert health['horizon_connection'] is True
+                assert health['soroban_rpc'] is True
+                assert health['contract_read'] is True
                 assert health['cache_service'] is True
-                assert health['end_to_end_test'] is True
+                mock_price.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_health_check_reuses_healthy_result(self):
+        """Test that a healthy result is served from cache within the TTL"""
+        ledgers_call = AsyncMock(return_value=Mock())
+        self.mock_server.ledgers.return_value.order.return_value.limit.return_value.call = ledgers_call
+        
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache:
+            mock_cache.is_connected.return_value = True
+            
+            with patch.object(self.client, '_soroban_health', return_value=True), \
+                 patch.object(self.client, '_sentinel_price_read', return_value=True):
+                first = await self.client.health_check()
+                second = await self.client.health_check()
+                
+                self.client.health_cache_ttl = 0
+                third = await self.client.health_check()
+        
+        assert first['status'] == second['status'] == 'healthy'
+        assert 'served_from_cache' not in first
+        assert second['served_from_cache'] is True
+        assert 'served_from_cache' not in third
+        assert ledgers_call.call_count == 2
 
     @pytest.mark.asyncio
     async def test_health_check_horizon_failure(self):
         """Test health check when Horizon connection fails"""
-        self.mock_server.ledgers.return_value.order.return_value.limit.return_value.call.side_effect = Exception("Connection failed")
+        self.mock_server.ledgers.return_value.order.return_value.limit.return_value.call = AsyncMock(side_effect=Exception("Connection failed"))
         
-        health = await self.client.health_check()
+        with patch.object(self.client, '_soroban_health', return_value=True), \
+             patch.object(self.client, '_sentinel_price_read', return_value=True):
+            health = await self.client.health_check()
         
         assert isinstance(health, dict)
         assert health['status'] == 'unhealthy'
         assert health['horizon_connection'] is False
 
     @pytest.mark.asyncio
-    async def test_health_check_end_to_end_failure(self):
-        """Test health check when end-to-end test fails"""
-        self.mock_server.ledgers.return_value.order.return_value.limit.return_value.call.return_value = Mock()
+    async def test_health_check_soroban_failure(self):
+        """Test health check when the Soroban RPC is unreachable"""
+        self.mock_server.ledgers.return_value.order.return_value.limit.return_value.call = AsyncMock(return_value=Mock())
         
         with patch('app.services.stellar_oracle.cache_service') as mock_cache:
             mock_cache.is_connected.return_value = True
             
-            with patch.object(self.client, 'get_asset_price', return_value=None):
+            with patch.object(self.client, '_soroban_health', side_effect=Exception("Connection refused")), \
+                 patch.object(self.client, '_sentinel_price_read', return_value=True):
                 health = await self.client.health_check()
                 
                 assert isinstance(health, dict)
                 assert health['status'] == 'degraded'
-                assert health['end_to_end_test'] is False
+                assert health['soroban_rpc'] is False
+
+    @pytest.mark.asyncio
+    async def test_health_check_contract_read_failure(self):
+        """Test that a Reflector contract that can't be read degrades the check"""
+        self.mock_server.ledgers.return_value.order.return_value.limit.return_value.call = AsyncMock(return_value=Mock())
+        
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache:
+            mock_cache.is_connected.return_value = True
+            
+            with patch.object(self.client, '_soroban_health', return_value=True), \
+                 patch.object(self.client, '_sentinel_price_read', side_effect=asyncio.TimeoutError):
+                health = await self.client.health_check()
+        
+        assert health['status'] == 'degraded'
+        assert health['soroban_rpc'] is True
+        assert health['contract_read'] is False
+
+    @pytest.mark.asyncio
+    async def test_health_check_cache_failure(self):
+        """Test that a failing Redis ping is reported without failing the check"""
+        self.mock_server.ledgers.return_value.order.return_value.limit.return_value.call = AsyncMock(return_value=Mock())
+        
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache:
+            mock_cache.is_connected.side_effect = Exception("Connection reset")
+            
+            with patch.object(self.client, '_soroban_health', return_value=True), \
+                 patch.object(self.client, '_sentinel_price_read', return_value=True):
+                health = await self.client.health_check()
+        
+        assert health['status'] == 'healthy'
+        assert health['horizon_connection'] is True
+        assert health['cache_service'] is False
 
     @pytest.mark.asyncio
     async def test_call_contract_price_not_implemented(self):
@@ -288,18 +411,18 @@ class TestStellarOracleClient:
         ]
         
         with patch('app.services.stellar_oracle.cache_service') as mock_cache:
-            mock_cache.get.return_value = cached_history
+            mock_cache.get_packed.return_value = cached_history
             
             history = await self.client.get_price_history('XLM')
             
             assert history == cached_history
-            mock_cache.get.assert_called_once_with('history:XLM:24h:1h')
+            mock_cache.get_packed.assert_called_once_with('oracle:history:XLM:24h:1h')
 
     @pytest.mark.asyncio
     async def test_get_price_history_dex_fallback(self):
         """Test price history from DEX trades"""
         with patch('app.services.stellar_oracle.cache_service') as mock_cache:
-            mock_cache.get.return_value = None
+            mock_cache.get_packed.return_value = None
             
             with patch.object(self.client, '_get_history_from_dex_trades', return_value=[
                 {"timestamp": "2024-01-01T00:00:00Z", "price": 0.12}
@@ -309,11 +432,183 @@ class TestStellarOracleClient:
                 assert len(history) == 1
                 assert history[0]["price"] == 0.12
 
+    @pytest.mark.asyncio
+    async def test_iter_price_history_streams_dex_points(self):
+        """Test that streamed history yields DEX points without caching them"""
+        async def fake_points(*args):
+            yield {"timestamp": "2024-01-01T00:00:00Z", "price": 0.12}
+            yield {"timestamp": "2024-01-01T01:00:00Z", "price": 0.13}
+
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache:
+            mock_cache.get_packed.return_value = None
+
+            with patch.object(self.client, '_iter_history_from_dex_trades', side_effect=fake_points):
+                history = [point async for point in self.client.iter_price_history('XLM')]
+
+                assert [point["price"] for point in history] == [0.12, 0.13]
+                mock_cache.set.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_history_from_dex_trades_buckets(self):
+        """Test that DEX trades are averaged per hourly bucket"""
+        hour_start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=3)
+
+        def trade(minutes, amount, price):
+            close_time = (hour_start + timedelta(minutes=minutes)).isoformat() + "Z"
+            return {"ledger_close_time": close_time, "base_amount": str(amount), "price": str(price),
+                    "paging_token": f"token-{minutes}"}
+
+        self.mock_server.trades.return_value.for_asset_pair.return_value.order.return_value.limit.return_value.call = AsyncMock(
+            return_value={"_embedded": {"records": [
+                trade(70, 10, 1.0),
+                trade(20, 10, 1.0),
+                trade(10, 30, 2.0)
+            ]}}
+        )
+
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache, \
+             patch.object(self.client, '_get_xlm_usd_price', return_value=0.5):
+            mock_cache.get_packed.return_value = None
+            history = await self.client._get_history_from_dex_trades('XLM')
+
+            state = mock_cache.set_packed.call_args.args[1]
+            assert state["cursor"] == "token-70"
+
+        assert [point["price"] for point in history] == [pytest.approx(0.875), pytest.approx(0.5)]
+        assert history[0]["timestamp"] == hour_start.isoformat() + "Z"
+
+    @pytest.mark.asyncio
+    async def test_get_history_from_dex_trades_incremental(self):
+        """Test that stored history state is only topped up with newer trades"""
+        hour_start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=2)
+        hour = str(int(hour_start.replace(tzinfo=timezone.utc).timestamp() // 3600))
+        since = (datetime.utcnow() - timedelta(days=1, hours=1)).replace(tzinfo=timezone.utc).timestamp()
+
+        trades_builder = self.mock_server.trades.return_value.for_asset_pair.return_value
+        trades_builder.cursor.return_value.order.return_value.limit.return_value.call = AsyncMock(
+            return_value={"_embedded": {"records": [{
+                "ledger_close_time": (hour_start + timedelta(minutes=30)).isoformat() + "Z",
+                "base_amount": "10", "price": "3.0", "paging_token": "token-new"
+            }]}}
+        )
+
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache, \
+             patch.object(self.client, '_get_xlm_usd_price', return_value=1.0):
+            mock_cache.get_packed.return_value = {"cursor": "token-old", "since": since, "buckets": {hour: [10.0, 10.0]}}
+            history = await self.client._get_history_from_dex_trades('XLM')
+
+        trades_builder.cursor.assert_called_once_with("token-old")
+        trades_builder.cursor.return_value.order.assert_called_once_with(desc=False)
+        assert [point["price"] for point in history] == [pytest.approx(2.0)]
+
+    @staticmethod
+    def _trade(close_time, amount, price, token):
+        """Horizon trade record closing at a naive UTC datetime"""
+        return {"ledger_close_time": close_time.isoformat() + "Z", "base_amount": str(amount),
+                "price": str(price), "paging_token": token}
+
+    @pytest.mark.asyncio
+    async def test_fetch_trades_since_pages_forward_from_cursor(self):
+        """Test that a cursor fetch follows paging tokens until a short page"""
+        self.client.TRADES_PAGE_SIZE = 2
+        hour_start = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+
+        trades_builder = self.mock_server.trades.return_value.for_asset_pair.return_value
+        trades_builder.cursor.return_value.order.return_value.limit.return_value.call = AsyncMock(side_effect=[
+            {"_embedded": {"records": [self._trade(hour_start, 1, 1.0, "t1"), self._trade(hour_start, 1, 1.0, "t2")]}},
+            {"_embedded": {"records": [self._trade(hour_start, 1, 1.0, "t3")]}}
+        ])
+
+        records, cursor, truncated_at = await self.client._fetch_trades_since(
+            self.client.server, "t0", hour_start - timedelta(days=1)
+        )
+
+        assert [call.args[0] for call in trades_builder.cursor.call_args_list] == ["t0", "t2"]
+        assert [record["paging_token"] for record in records] == ["t1", "t2", "t3"]
+        assert cursor == "t3"
+        assert truncated_at is None
+
+    @pytest.mark.asyncio
+    async def test_get_history_from_dex_trades_page_cap(self):
+        """Test that a capped cold fetch only claims the hours it fully covers"""
+        self.client.TRADES_PAGE_SIZE = 2
+        self.client.HISTORY_MAX_PAGES = 2
+        hour_start = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        newer, older = hour_start - timedelta(hours=1), hour_start - timedelta(hours=2)
+
+        trades_builder = self.mock_server.trades.return_value.for_asset_pair.return_value
+        trades_builder.order.return_value.limit.return_value.call = AsyncMock(return_value={"_embedded": {"records": [
+            self._trade(newer + timedelta(minutes=50), 10, 1.0, "t4"),
+            self._trade(newer + timedelta(minutes=40), 10, 1.0, "t3")
+        ]}})
+        trades_builder.cursor.return_value.order.return_value.limit.return_value.call = AsyncMock(return_value={"_embedded": {"records": [
+            self._trade(older + timedelta(minutes=30), 10, 2.0, "t2"),
+            self._trade(older + timedelta(minutes=20), 10, 2.0, "t1")
+        ]}})
+
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache, \
+             patch.object(self.client, '_get_xlm_usd_price', return_value=1.0):
+            mock_cache.get_packed.return_value = None
+            history = await self.client._get_history_from_dex_trades('XLM')
+
+        trades_builder.cursor.assert_called_once_with("t3")
+        state_key, state = mock_cache.set_packed.call_args.args
+        assert state_key == 'oracle:history_state:XLM'
+        assert state["cursor"] == "t4"
+        assert state["since"] == newer.replace(tzinfo=timezone.utc).timestamp()
+        assert history == [{"timestamp": newer.isoformat() + "Z", "price": pytest.approx(1.0)}]
+
+    @pytest.mark.asyncio
+    async def test_get_history_from_dex_trades_merges_state(self):
+        """Test that new trades are added to the stored bucket sums"""
+        hour_start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=2)
+        hour = str(int(hour_start.replace(tzinfo=timezone.utc).timestamp() // 3600))
+        since = (datetime.utcnow() - timedelta(days=1, hours=1)).replace(tzinfo=timezone.utc).timestamp()
+
+        trades_builder = self.mock_server.trades.return_value.for_asset_pair.return_value
+        trades_builder.cursor.return_value.order.return_value.limit.return_value.call = AsyncMock(
+            return_value={"_embedded": {"records": [self._trade(hour_start + timedelta(minutes=30), 10, 3.0, "token-new")]}}
+        )
+
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache, \
+             patch.object(self.client, '_get_xlm_usd_price', return_value=1.0):
+            mock_cache.get_packed.return_value = {"cursor": "token-old", "since": since, "buckets": {hour: [10.0, 10.0]}}
+            await self.client._get_history_from_dex_trades('XLM')
+
+        state_key, state = mock_cache.set_packed.call_args.args
+        assert state_key == 'oracle:history_state:XLM'
+        assert state == {"cursor": "token-new", "since": since, "buckets": {hour: [20.0, 40.0]}}
+
+    @pytest.mark.asyncio
+    async def test_get_history_from_dex_trades_rebuilds_for_wider_window(self):
+        """Test that state covering less than the requested period is rebuilt"""
+        hour_start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(days=3)
+        since = (datetime.utcnow() - timedelta(days=1, hours=1)).replace(tzinfo=timezone.utc).timestamp()
+        stale_hour = str(int(time.time() // 3600))
+
+        trades_builder = self.mock_server.trades.return_value.for_asset_pair.return_value
+        trades_builder.order.return_value.limit.return_value.call = AsyncMock(
+            return_value={"_embedded": {"records": [self._trade(hour_start, 10, 2.0, "token-new")]}}
+        )
+
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache, \
+             patch.object(self.client, '_get_xlm_usd_price', return_value=1.0):
+            mock_cache.get_packed.return_value = {"cursor": "token-old", "since": since, "buckets": {stale_hour: [10.0, 10.0]}}
+            history = await self.client._get_history_from_dex_trades('XLM', period="7d")
+
+        trades_builder.cursor.assert_not_called()
+        trades_builder.order.assert_called_once_with(desc=True)
+        state = mock_cache.set_packed.call_args.args[1]
+        assert state["cursor"] == "token-new"
+        assert state["since"] < since - 5 * 24 * 3600
+        assert list(state["buckets"]) == [str(int(hour_start.replace(tzinfo=timezone.utc).timestamp() // 3600))]
+        assert [point["price"] for point in history] == [pytest.approx(2.0)]
+
     @pytest.mark.asyncio
     async def test_get_price_history_final_fallback(self):
         """Test price history final fallback"""
         with patch('app.services.stellar_oracle.cache_service') as mock_cache:
-            mock_cache.get.return_value = None
+            mock_cache.get_packed.return_value = None
             
             with patch.object(self.client, '_get_history_from_dex_trades', return_value=[]):
                 history = await self.client.get_price_history('XLM')
@@ -322,3 +617,362 @@ class TestStellarOracleClient:
                 assert history[0]["price"] == 0.12
                 assert history[1]["price"] == 0.13
                 assert history[2]["price"] == 0.11
+
+    @pytest.mark.asyncio
+    async def test_get_multiple_prices_waterfall(self):
+        """Test that later contract sources only receive the earlier misses"""
+        aqua_issuer = "GA5ZSEJYB37JRC5AVCIA5MOP4RHTM335X2KGX3IHOJAPP5RE34K4KZVN"
+        calls = []
+
+        async def fake_batch(contract_id, assets):
+            calls.append((contract_id, set(assets)))
+            if contract_id == self.client.contracts["stellar_dex"]:
+                return {"XLM": 0.12}
+            if contract_id == self.client.contracts["external_cex"]:
+                return {f"AQUA:{aqua_issuer}": 0.002}
+            return {}
+
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache:
+            mock_cache.get.return_value = None
+
+            with patch.object(self.client, '_batch_price_from_contract', side_effect=fake_batch):
+                prices = await self.client.get_multiple_prices([
+                    {"code": "XLM"},
+                    {"code": "AQUA", "issuer": aqua_issuer}
+                ])
+
+        assert prices == {"XLM": 0.12, "AQUA": 0.002}
+        assert calls == [
+            (self.client.contracts["stellar_dex"], {"XLM", f"AQUA:{aqua_issuer}"}),
+            (self.client.contracts["external_cex"], {f"AQUA:{aqua_issuer}"})
+        ]
+
+    @pytest.mark.asyncio
+    async def test_get_multiple_prices_runs_fallbacks_concurrently(self):
+        """Test that fallback lookups run in parallel and slow ones time out"""
+        self.client.FALLBACK_TIMEOUT = 0.05
+        running = 0
+        peak = 0
+
+        async def fake_fallback(asset_code, asset_issuer, asset_id):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(1 if asset_code == "SLOW" else 0.01)
+            running -= 1
+            return 0.5
+
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache, \
+             patch.object(self.client, '_batch_price_from_contract', new_callable=AsyncMock, return_value={}), \
+             patch.object(self.client, '_get_fallback_price', side_effect=fake_fallback):
+            mock_cache.get.return_value = None
+            prices = await self.client.get_multiple_prices([{"code": "AQUA"}, {"code": "YBX"}, {"code": "SLOW"}])
+
+        assert prices == {"AQUA": 0.5, "YBX": 0.5}
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_stable_peg_skips_lookups(self):
+        """Test that pegged stablecoins are priced without touching any source"""
+        self.client.stable_pegs = {"USDC:GA5ZSEJYB37JRC5AVCIA5MOP4RHTM335X2KGX3IHOJAPP5RE34K4KZVN": 1.0}
+
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache, \
+             patch.object(self.client, '_batch_price_from_contract', new_callable=AsyncMock) as mock_batch, \
+             patch.object(self.client, '_fetch_asset_price', new_callable=AsyncMock) as mock_fetch:
+            assert await self.client.get_asset_price('USDC', 'GA5ZSEJYB37JRC5AVCIA5MOP4RHTM335X2KGX3IHOJAPP5RE34K4KZVN') == 1.0
+            prices = await self.client.get_multiple_prices([
+                {"code": "USDC", "issuer": "GA5ZSEJYB37JRC5AVCIA5MOP4RHTM335X2KGX3IHOJAPP5RE34K4KZVN"}
+            ])
+
+        assert prices == {"USDC": 1.0}
+        mock_cache.get.assert_not_called()
+        mock_batch.assert_not_called()
+        mock_fetch.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stable_peg_ignores_other_issuers(self):
+        """Test that a stablecoin code from an unknown issuer is looked up normally"""
+        fake_issuer = "GBDEVU63Y6NTHJQQZIKVTC23NWLQVP3WJ2RI2OTSJTNYOIGICST6DUXR"
+        self.client.stable_pegs = {"USDC:GA5ZSEJYB37JRC5AVCIA5MOP4RHTM335X2KGX3IHOJAPP5RE34K4KZVN": 1.0}
+
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache, \
+             patch.object(self.client, '_fetch_asset_price', new_callable=AsyncMock, return_value=0.01) as mock_fetch:
+            mock_cache.get.return_value = None
+            price = await self.client.get_asset_price('USDC', fake_issuer)
+
+        assert price == 0.01
+        mock_fetch.assert_called_once_with('USDC', fake_issuer, f"USDC:{fake_issuer}")
+
+    @pytest.mark.asyncio
+    async def test_unpegged_usdc_falls_back_to_one_dollar(self):
+        """Test that USDC no source could price still gets the last-resort $1"""
+        issuer = "GBDEVU63Y6NTHJQQZIKVTC23NWLQVP3WJ2RI2OTSJTNYOIGICST6DUXR"
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache, \
+             patch.object(self.client, '_call_contract_price', return_value=None) as mock_call, \
+             patch.object(self.client, '_get_price_from_dex_trades', return_value=None):
+            mock_cache.get.return_value = None
+            assert await self.client.get_asset_price('USDC') == 1.0
+            assert await self.client.get_asset_price('USDC', issuer) == 1.0
+
+        # The live sources were still asked first, and the made-up price isn't cached
+        assert mock_call.called
+        assert not any(call.args[0].startswith('oracle:price:') for call in mock_cache.set.call_args_list)
+
+    @pytest.mark.asyncio
+    async def test_batch_price_from_contract_matches_by_id(self):
+        """Test that batched responses are matched to assets by JSON-RPC id"""
+        usdc_issuer = "GA5ZSEJYB37JRC5AVCIA5MOP4RHTM335X2KGX3IHOJAPP5RE34K4KZVN"
+
+        async def fake_soroban_batch(payloads):
+            # Answer in reverse order, the second request without a price
+            return msgspec.convert([
+                {"jsonrpc": "2.0", "id": payloads[1]["id"], "result": {"success": False}},
+                {"jsonrpc": "2.0", "id": payloads[0]["id"], "result": {"success": True, "result": {"price": "12000000000000"}}}
+            ], List[SimulateResponse])
+
+        with patch.object(self.client, '_soroban_batch', side_effect=fake_soroban_batch) as mock_batch:
+            found = await self.client._batch_price_from_contract("test_contract", {
+                "XLM": ("XLM", None),
+                f"USDC:{usdc_issuer}": ("USDC", usdc_issuer)
+            })
+
+        mock_batch.assert_called_once()
+        assert found == {"XLM": pytest.approx(0.12)}
+
+    @pytest.mark.asyncio
+    async def test_batch_price_from_contract_chunks_large_batches(self):
+        """Test that batches above max_batch_size are split into several calls"""
+        self.client.max_batch_size = 2
+        issuer = "GA5ZSEJYB37JRC5AVCIA5MOP4RHTM335X2KGX3IHOJAPP5RE34K4KZVN"
+        assets = {f"TK{i}:{issuer}": (f"TK{i}", issuer) for i in range(5)}
+
+        async def fake_soroban_batch(payloads):
+            return msgspec.convert([
+                {"jsonrpc": "2.0", "id": payload["id"], "result": {"success": True, "result": {"price": "100000000000000"}}}
+                for payload in payloads
+            ], List[SimulateResponse])
+
+        with patch.object(self.client, '_soroban_batch', side_effect=fake_soroban_batch) as mock_batch:
+            found = await self.client._batch_price_from_contract("test_contract", assets)
+
+        assert mock_batch.call_count == 3
+        assert all(len(call.args[0]) <= 2 for call in mock_batch.call_args_list)
+        assert found == {asset_id: pytest.approx(1.0) for asset_id in assets}
+
+    @pytest.mark.asyncio
+    async def test_get_asset_price_local_cache(self):
+        """Test that repeat lookups are served from the in-process cache"""
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache:
+            mock_cache.get.return_value = None
+
+            with patch.object(self.client, '_call_contract_price', return_value=0.15) as mock_call:
+                first = await self.client.get_asset_price('XLM')
+                second = await self.client.get_asset_price('XLM')
+
+                assert first == second == 0.15
+                assert mock_call.call_count == len(self.client.CONTRACT_SOURCES)
+                assert [c.args[0] for c in mock_cache.get.call_args_list] == ['oracle:price:XLM', 'oracle:source:XLM']
+
+    def test_local_price_cache_is_bounded(self):
+        """Test that the in-process price cache evicts the oldest entry when full"""
+        self.client.price_cache_size = 2
+        self.client._set_local_price("A", 1.0)
+        self.client._set_local_price("B", 2.0)
+        self.client._set_local_price("C", 3.0)
+
+        assert len(self.client._price_cache) == 2
+        assert self.client._get_local_price("A") is None
+        assert self.client._get_local_price("C") == 3.0
+
+    @pytest.mark.asyncio
+    async def test_call_contract_price_circuit_breaker(self):
+        """Test that a failing contract source is skipped after repeated failures"""
+        self.client._http = Mock()
+        self.client._http.post = AsyncMock(side_effect=Exception("Connection refused"))
+
+        with patch.object(self.client, '_get_price_from_reflector_api', return_value=None):
+            for _ in range(self.client.BREAKER_FAILURE_THRESHOLD + 2):
+                price = await self.client._call_contract_price("test_contract", "XLM")
+                assert price is None
+
+        assert self.client._http.post.call_count == self.client.BREAKER_FAILURE_THRESHOLD
+        assert not self.client._source_available("test_contract")
+
+    @pytest.mark.asyncio
+    async def test_call_contract_price_error_payloads_trip_breaker(self):
+        """Test that 200 responses carrying an RPC error still count as failures"""
+        self.client._http = Mock()
+        self.client._http.post = AsyncMock(return_value=Mock(
+            status_code=200, content=b'{"jsonrpc": "2.0", "id": 1, "error": {"code": -32600, "message": "invalid"}}'
+        ))
+
+        for _ in range(self.client.BREAKER_FAILURE_THRESHOLD + 2):
+            assert await self.client._call_contract_price("test_contract", "XLM") is None
+
+        assert self.client._http.post.call_count == self.client.BREAKER_FAILURE_THRESHOLD
+        assert not self.client._source_available("test_contract")
+
+    @pytest.mark.asyncio
+    async def test_get_asset_price_source_hint(self):
+        """Test that the source that last priced an asset is tried first"""
+        external_cex = self.client.contracts["external_cex"]
+        calls = []
+
+        async def fake_call(contract_id, asset_code, asset_issuer=None):
+            calls.append(contract_id)
+            return 0.12 if contract_id == external_cex else None
+
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache:
+            mock_cache.get.return_value = None
+
+            with patch.object(self.client, '_call_contract_price', side_effect=fake_call):
+                await self.client.get_asset_price('XLM')
+                self.client._price_cache.clear()
+                calls.clear()
+                price = await self.client.get_asset_price('XLM')
+
+        assert price == 0.12
+        assert calls == [external_cex]
+        assert self.client._source_hint['XLM'] == 'external_cex'
+
+    @pytest.mark.asyncio
+    async def test_get_asset_price_persisted_source_hint(self):
+        """Test that a source learned by another process is read from Redis"""
+        fiat = self.client.contracts["fiat"]
+        calls = []
+
+        async def fake_call(contract_id, asset_code, asset_issuer=None):
+            calls.append(contract_id)
+            return None if contract_id == fiat else 0.12
+
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache:
+            mock_cache.get.side_effect = lambda key: 'fiat' if key == 'oracle:source:XLM' else None
+
+            with patch.object(self.client, '_call_contract_price', side_effect=fake_call):
+                price = await self.client.get_asset_price('XLM')
+
+        # The learned source missed, so it is forgotten and the others are asked
+        assert price == 0.12
+        assert calls[0] == fiat
+        assert len(calls) == len(self.client.CONTRACT_SOURCES)
+        mock_cache.delete.assert_called_once_with('oracle:source:XLM')
+        assert self.client._source_hint['XLM'] == 'stellar_dex'
+
+    @pytest.mark.asyncio
+    async def test_get_asset_price_prefers_higher_priority_source(self):
+        """Test that concurrent contract calls still honor source priority"""
+        stellar_dex = self.client.contracts["stellar_dex"]
+
+        async def fake_call(contract_id, asset_code, asset_issuer=None):
+            if contract_id == stellar_dex:
+                await asyncio.sleep(0.01)
+                return 0.15
+            return 0.2
+
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache:
+            mock_cache.get.return_value = None
+
+            with patch.object(self.client, '_call_contract_price', side_effect=fake_call) as mock_call:
+                price = await self.client.get_asset_price('XLM')
+
+        assert price == 0.15
+        assert mock_call.call_count == len(self.client.CONTRACT_SOURCES)
+
+    @pytest.mark.asyncio
+    async def test_get_asset_price_speculates_dex_once(self):
+        """Test that the speculative DEX lookup is reused by the fallback"""
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache:
+            mock_cache.get.return_value = None
+
+            with patch.object(self.client, '_call_contract_price', return_value=None), \
+                 patch.object(self.client, '_get_price_from_dex_trades', return_value=0.18) as mock_dex:
+                price = await self.client.get_asset_price('XLM')
+
+        assert price == 0.18
+        mock_dex.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_asset_price_without_dex_speculation(self):
+        """Test that DEX speculation can be disabled"""
+        client = StellarOracleClient(speculate_dex=False)
+
+        with patch('app.services.stellar_oracle.cache_service') as mock_cache:
+            mock_cache.get.return_value = None
+
+            with patch.object(client, '_call_contract_price', return_value=0.15), \
+                 patch.object(client, '_get_price_from_dex_trades') as mock_dex:
+                price = await client.get_asset_price('XLM')
+
+        assert price == 0.15
+        mock_dex.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_asset_price_coalesces_concurrent_requests(self):
+        """Test that concurrent lookups for one asset share a single fetch"""
+        async def slow_fetch(asset_code, asset_issuer, asset_id):
+            await asyncio.sleep(0.01)
+            return 0.12
+
+        with patch.object(self.client, '_fetch_asset_price', side_effect=slow_fetch) as mock_fetch:
+            prices = await asyncio.gather(*(self.client.get_asset_price('XLM') for _ in range(5)))
+
+        assert prices == [0.12] * 5
+        mock_fetch.assert_called_once()
+        assert not self.client._inflight
+
+    @pytest.mark.asyncio
+    async def test_get_asset_price_survives_cancelled_leader(self):
+        """Test that waiters take over a lookup whose caller was cancelled"""
+        calls = 0
+
+        async def fetch(asset_code, asset_issuer, asset_id):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(10)
+            return 0.12
+
+        with patch.object(self.client, '_fetch_asset_price', side_effect=fetch):
+            leader = asyncio.create_task(self.client.get_asset_price('XLM'))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(self.client.get_asset_price('XLM'))
+            await asyncio.sleep(0)
+            leader.cancel()
+
+            assert await waiter == 0.12
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert calls == 2
+        assert not self.client._inflight
+
+    def test_fetch_limits_are_per_event_loop(self):
+        """Test that the client keeps working when used from another event loop"""
+        async def slow_fetch(asset_code, asset_issuer, asset_id):
+            await asyncio.sleep(0.001)
+            return 0.12
+
+        async def fetch_many():
+            # More lookups than the semaphore allows, so some have to wait on it
+            return await asyncio.gather(*(
+                self.client.get_asset_price(f'A{i}', 'GISSUER') for i in range(settings.ORACLE_MAX_CONCURRENCY + 2)
+            ))
+
+        with patch.object(self.client, '_fetch_asset_price', side_effect=slow_fetch):
+            for _ in range(2):
+                self.client._price_cache.clear()
+                assert asyncio.run(fetch_many()) == [0.12] * (settings.ORACLE_MAX_CONCURRENCY + 2)
+
+    def test_http_clients_are_per_event_loop(self):
+        """Test that each event loop gets its own HTTP client, closed by close()"""
+        async def use_and_close():
+            http = self.client._http
+            assert self.client._http is http
+            await self.client.close()
+            return http
+
+        first = asyncio.run(use_and_close())
+        second = asyncio.run(use_and_close())
+
+        assert first is not second
+        assert first.is_closed and second.is_closed